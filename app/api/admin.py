@@ -1,21 +1,31 @@
 import uuid
 
 from core import db_helper as db
+from core.assets import asset_manifest
 from core.config import settings
+from core.http_cache import (build_validator, is_not_modified,
+                             not_modified_response, templates_fingerprint,
+                             validator_headers)
+from core.templates import admin
+from crud.publish import landing_publisher
 from crud.sections import (add_img, create_card, delete_card, get_all,
-                           update_content, update_image)
+                           get_content_state, reorder_cards, update_content,
+                           update_image)
 from dependencies.dep_auth import get_current_user
 from fastapi import APIRouter, Depends, File, Request, UploadFile
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from loguru import logger
-from sections.schemas import (CardCreate, EntityDelete, EntityUpdate,
-                              ImageUpdate)
+from sections.schemas import (CardCreate, CardsReorder, EntityDelete,
+                              EntityUpdate, ImageUpdate)
 from sqlalchemy.ext.asyncio import AsyncSession
 from users.models import User
 
-# Инициализация Jinja2Templates с указанием директории шаблонов
-admin = Jinja2Templates(directory=settings.files.admin_templates)
+# Отпечаток шаблонов входит в ETag страницы
+admin_fingerprint = (
+    templates_fingerprint(settings.files.admin_templates) + asset_manifest.version
+)
+# Страница доступна только авторизованным, общим кэшам ее хранить нельзя
+ADMIN_CACHE_CONTROL = "private, no-cache"
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -26,11 +36,17 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 async def get_admin(
     request: Request,
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(db.get_session_without_commit),
+    session: AsyncSession = Depends(db.get_read_session),
 ):
+    etag, last_modified = build_validator(
+        await get_content_state(session=session), salt=admin_fingerprint
+    )
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified, ADMIN_CACHE_CONTROL)
     return admin.TemplateResponse(
         "index.html",
         await get_all(request=request, session=session),
+        headers=validator_headers(etag, last_modified, ADMIN_CACHE_CONTROL),
     )
 
 
@@ -44,6 +60,17 @@ async def new_istance(
     return await create_card(table_name=table_name, payload=payload, session=session)
 
 
+# Перенести карточки внутри секции (drag-and-drop)
+@router.post("/sections/{table_name}/reorder")
+async def reorder_instances(
+    table_name: str,
+    payload: CardsReorder,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(db.get_session_without_commit),
+):
+    return await reorder_cards(table_name=table_name, payload=payload, session=session)
+
+
 # Удалить запись из вложенной в секцию сущности
 @router.delete("/sections/{table_name}")
 async def remove_instance(
@@ -108,3 +135,13 @@ async def patch_img(
     return await update_image(
         id=id, table_name=table_name, payload=payload, session=session
     )
+
+
+# ресурс на публикацию лендинга в статический файл
+@router.post("/publish")
+async def publish_landing(
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(db.get_session_without_commit),
+):
+    path = await landing_publisher.publish(session=session)
+    return {"message": "Лендинг успешно опубликован", "url": f"/{path.as_posix()}"}
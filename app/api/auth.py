@@ -1,11 +1,12 @@
 from auth.schemas import (EmailModel, SUserAddDB, SUserAuth, SUserInfo,
                           SUserRegister)
-from auth.utils import authenticate_user, hash_password, set_tokens
+from auth.token_cache import token_cache
+from auth.utils import authenticate_user, hash_password_async, set_tokens
 from core import db_helper
 from core.exceptions import exc
 from crud.users import UsersDAO
 from dependencies.dep_auth import check_refresh_token, get_current_user
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from users.models import User
 
@@ -28,7 +29,7 @@ async def register_user(
     user_data_dict = user_data.model_dump()
     user_data_dict.pop("confirm_password", None)
     # Хеширование пароля (пароль остается строкой)
-    user_data_dict["password"] = hash_password(user_data_dict["password"])
+    user_data_dict["password"] = await hash_password_async(user_data_dict["password"])
     # Добавление пользователя
     await user_dao.add(values=SUserAddDB(**user_data_dict))
     return {"message": "Вы успешно зарегистрированы!"}
@@ -38,7 +39,7 @@ async def register_user(
 async def auth_user(
     response: Response,
     user_data: SUserAuth,
-    session: AsyncSession = Depends(db_helper.get_session_without_commit),
+    session: AsyncSession = Depends(db_helper.get_read_session),
 ) -> dict:
     users_dao = UsersDAO(session)
     user = await users_dao.find_one_or_none(filters=EmailModel(email=user_data.email))
@@ -49,7 +50,8 @@ async def auth_user(
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
+    token_cache.evict(request.cookies.get("access_token"))
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
     return {"message": "Пользователь успешно вышел из системы"}
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from core import db_helper as db
+from core.config import settings
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from loguru import logger
+from sqlalchemy import text
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+# Живость процесса: без обращения к БД
+@router.get("")
+async def health():
+    return {"status": "ok"}
+
+
+# Готовность принимать трафик: балансировщик уводит запросы с насыщенного воркера
+@router.get("/ready")
+async def readiness():
+    pool = db.pool_metrics.snapshot(db.engine.sync_engine.pool)
+    # недоступная реплика не делает воркер неготовым: чтения уйдут на primary
+    now = time.monotonic()
+    replicas = [replica.snapshot(now) for replica in db.replicas]
+    if pool["waiting"] > settings.db.ready_max_waiting:
+        # проверка запросом только добавила бы еще одного ожидающего
+        return JSONResponse(
+            {"status": "saturated", "pool": pool, "replicas": replicas},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    try:
+        async with asyncio.timeout(settings.db.ready_timeout):
+            async with db.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Проверка готовности БД не пройдена: {e!r}")
+        return JSONResponse(
+            {"status": "unavailable", "pool": pool, "replicas": replicas},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return {"status": "ok", "pool": pool, "replicas": replicas}
@@ -1,14 +1,23 @@
 from core import db_helper as db
+from core.assets import asset_manifest
+from core.cache import CachedPage, page_cache
 from core.config import settings
-from crud.sections import get_all
+from core.http_cache import (build_validator, is_not_modified,
+                             not_modified_response, templates_fingerprint,
+                             validator_headers)
+from core.templates import landing
+from crud.sections import get_all, get_content_state
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
-# Инициализация Jinja2Templates с указанием директории шаблонов
-landing = Jinja2Templates(directory=settings.files.landing_templates)
+# Отпечаток шаблонов входит в ETag страницы
+landing_fingerprint = (
+    templates_fingerprint(settings.files.landing_templates) + asset_manifest.version
+)
+# Браузер и прокси хранят страницу, но перепроверяют ее при каждом запросе
+LANDING_CACHE_CONTROL = "public, no-cache"
 
 
 router = APIRouter(tags=["landing"])
@@ -16,10 +25,29 @@ router = APIRouter(tags=["landing"])
 
 @router.get("/", response_class=HTMLResponse)
 async def render_landing(
-    request: Request, session: AsyncSession = Depends(db.get_session_without_commit)
+    request: Request, session: AsyncSession = Depends(db.get_read_session)
 ):
-    # Рендеринг HTML с данными
-    return landing.TemplateResponse(
-        "index.html",
-        await get_all(request=request, session=session),
+    # Отдаем страницу из кэша, пока контент не менялся
+    page = page_cache.get("landing/index.html")
+    if page is None:
+        version = page_cache.version
+        # Дешевая проверка актуальности до загрузки ORM-объектов и рендеринга
+        etag, last_modified = build_validator(
+            await get_content_state(session=session), salt=landing_fingerprint
+        )
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified, LANDING_CACHE_CONTROL)
+        # Рендеринг HTML с данными
+        html = landing.get_template("index.html").render(
+            await get_all(request=request, session=session)
+        )
+        page = CachedPage(html=html, etag=etag, last_modified=last_modified)
+        page_cache.set("landing/index.html", page, version=version)
+    elif is_not_modified(request, page.etag, page.last_modified):
+        return not_modified_response(
+            page.etag, page.last_modified, LANDING_CACHE_CONTROL
+        )
+    return HTMLResponse(
+        page.html,
+        headers=validator_headers(page.etag, page.last_modified, LANDING_CACHE_CONTROL),
     )
@@ -0,0 +1,26 @@
+from ipaddress import ip_address
+
+from core.config import settings
+from core.metrics import metrics
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter(tags=["metrics"])
+
+
+def is_internal(request: Request) -> bool:
+    try:
+        client = ip_address(request.client.host)
+    except (AttributeError, ValueError):
+        return False
+    return any(client in network for network in settings.metrics.allowed_networks)
+
+
+# Метрики для Prometheus: отдаем только во внутреннюю сеть
+@router.get(settings.metrics.path, include_in_schema=False)
+async def get_metrics(request: Request):
+    if not is_internal(request):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
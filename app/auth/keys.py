@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import jwt
+from core.config import settings
+from jwt.algorithms import get_default_algorithms
+from loguru import logger
+
+# Асимметричные алгоритмы: подпись закрытым ключом, проверка открытым
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+class SigningKeys(NamedTuple):
+    algorithm: str
+    private_key: Any
+    public_key: Any
+
+
+def load_signing_keys(
+    private_key: Path, public_key: Path, algorithm: str
+) -> SigningKeys:
+    """Загрузка ключей из PEM один раз при старте.
+
+    PyJWT не разбирает повторно уже готовые объекты ключей, поэтому подпись и
+    проверка токена обходятся без парсинга PEM на каждый вызов.
+
+    Args:
+        private_key (Path): PEM закрытого ключа
+        public_key (Path): PEM открытого ключа
+        algorithm (str): алгоритм подписи (RS256, ES256, EdDSA)
+    Returns:
+        SigningKeys: алгоритм и объекты ключей
+    """
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        raise ValueError(
+            f"Алгоритм {algorithm} не поддерживается, доступны: {SUPPORTED_ALGORITHMS}"
+        )
+    jwt_algorithm = get_default_algorithms()[algorithm]
+    keys = SigningKeys(
+        algorithm=algorithm,
+        private_key=jwt_algorithm.prepare_key(private_key.read_bytes()),
+        public_key=jwt_algorithm.prepare_key(public_key.read_bytes()),
+    )
+    # ключи другого типа или не из одной пары иначе всплыли бы только при входе
+    probe = jwt.encode({"probe": True}, keys.private_key, algorithm=algorithm)
+    jwt.decode(probe, keys.public_key, algorithms=[algorithm])
+    logger.info(f"Ключи JWT загружены, алгоритм подписи: {algorithm}")
+    return keys
+
+
+jwt_keys = load_signing_keys(
+    private_key=settings.auth.private_key,
+    public_key=settings.auth.public_key,
+    algorithm=settings.auth.algorithm,
+)
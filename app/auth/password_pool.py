@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from core.config import settings
+from core.exceptions import exc
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class PasswordPool:
+    """Отдельный пул потоков для bcrypt.
+
+    bcrypt отпускает GIL, поэтому хеширование идет параллельно с event loop и
+    не задерживает отдачу страниц. Число задач в пуле ограничено: при всплеске
+    входов лишние запросы сразу получают 503, а не копятся в очереди.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float) -> None:
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.timeout = timeout
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Выполнение функции в пуле с ограничением очереди и таймаутом
+        Args:
+            func (Callable): синхронная функция (hashpw, checkpw)
+            args: аргументы функции
+        Returns:
+            T: результат функции
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning("Очередь проверки паролей переполнена")
+                raise exc.auth_overloaded
+            self._pending += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt"
+            )
+        future = self._executor.submit(func, *args)
+        # место в очереди освобождается, только когда поток действительно закончил
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Проверка пароля не уложилась в {} с", self.timeout)
+            raise exc.auth_overloaded
+
+    def shutdown(self) -> None:
+        """Остановка пула при завершении приложения"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+password_pool = PasswordPool(
+    workers=settings.passwords.workers,
+    queue_size=settings.passwords.queue_size,
+    timeout=settings.passwords.timeout,
+)
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from core.config import settings
+from sqlalchemy import inspect
+from users.models import User
+
+
+class Principal(NamedTuple):
+    claims: dict
+    user: User
+    expires_at: float
+
+
+def snapshot_user(user: User) -> User:
+    """Копия пользователя, не привязанная к сессии.
+
+    Объект из закрытой сессии после rollback становится просроченным, поэтому
+    в кэше храним отдельный экземпляр только с загруженными колонками.
+    """
+    return User(
+        **{column.key: getattr(user, column.key) for column in inspect(User).columns}
+    )
+
+
+class TokenCache:
+    """LRU-кэш проверенных access-токенов.
+
+    Запись живет до истечения токена, но не дольше max_age: другие воркеры
+    узнают об изменении пользователя только по этому сроку.
+    """
+
+    def __init__(self, max_size: int, max_age: float, enabled: bool = True) -> None:
+        self.max_size = max_size
+        self.max_age = max_age
+        self.enabled = enabled
+        self._principals: OrderedDict[str, Principal] = OrderedDict()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Номер сброса кэша: снимок, прочитанный до сброса, сохранять нельзя"""
+        return self._generation
+
+    def get(self, token: str) -> Principal | None:
+        """Проверенные данные токена или None, если их нужно получить заново
+        Args:
+            token (str): access-токен из куки
+        Returns:
+            Principal | None: утверждения токена и снимок пользователя
+        """
+        principal = self._principals.get(token)
+        if principal is None:
+            return None
+        if principal.expires_at <= time.time():
+            del self._principals[token]
+            return None
+        self._principals.move_to_end(token)
+        return principal
+
+    def set(
+        self, token: str, claims: dict, user: User, generation: int | None = None
+    ) -> None:
+        """Сохранение токена после проверки подписи и загрузки пользователя
+        Args:
+            token (str): access-токен из куки
+            claims (dict): утверждения токена
+            user (User): пользователь из БД
+            generation (int | None): generation на момент чтения пользователя
+        """
+        if not self.enabled:
+            return
+        # пока пользователя читали, его изменили и закоммитили
+        if generation is not None and generation != self._generation:
+            return
+        expires_at = min(int(claims["exp"]), time.time() + self.max_age)
+        self._principals[token] = Principal(claims, snapshot_user(user), expires_at)
+        self._principals.move_to_end(token)
+        while len(self._principals) > self.max_size:
+            self._principals.popitem(last=False)
+
+    def evict(self, token: str | None) -> None:
+        """Удаление токена, например при выходе из системы"""
+        if token:
+            self._principals.pop(token, None)
+
+    def clear(self) -> None:
+        """Сброс всех записей после изменения пользователей"""
+        self._principals.clear()
+        self._generation += 1
+
+
+token_cache = TokenCache(
+    max_size=settings.auth.token_cache_size,
+    max_age=settings.auth.token_cache_max_age,
+    enabled=settings.auth.token_cache_enabled,
+)
@@ -2,6 +2,8 @@ from datetime import datetime, timedelta, timezone
 
 import bcrypt
 import jwt
+from auth.keys import jwt_keys
+from auth.password_pool import password_pool
 from core.config import settings
 from fastapi import Response
 from loguru import logger
@@ -24,8 +26,8 @@ def create_tokens(data: dict) -> dict:
 
 def encode_jwt(
     payload: dict,
-    private_key: str = settings.auth.private_key.read_text(),
-    algorithm: str = settings.auth.algorithm,
+    private_key=jwt_keys.private_key,
+    algorithm: str = jwt_keys.algorithm,
     expire_delta: timedelta | None = None,
 ):
     to_encode = payload.copy()
@@ -44,11 +46,11 @@ def encode_jwt(
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = settings.auth.public_key.read_text(),
-    algorithm: str = settings.auth.algorithm,
+    public_key=jwt_keys.public_key,
+    algorithm: str = jwt_keys.algorithm,
 ):
     decode = jwt.decode(token, public_key, algorithms=[algorithm])
-    logger.info(f"Получаем декод токена: {decode}")
+    logger.debug("Получаем декод токена: {}", decode)
     return decode
 
 
@@ -56,7 +58,7 @@ def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
     hashed_password_bytes: bytes = bcrypt.hashpw(password.encode("utf-8"), salt)
     hashed_password = hashed_password_bytes.decode("utf-8")
-    logger.info(f"Хешированный пароль: {hashed_password}")
+    logger.info("Хешированный пароль: {}", hashed_password)
     return hashed_password
 
 
@@ -71,15 +73,28 @@ def validate_password(password: str, hashed_password: str) -> bool:
         #     logger.error(f"Пароль из формы: {password} != пароль из БД: {hashed_password} – Не равны...")
         return valid_pass
     except Exception as e:
-        logger.error(f"Ошибка при проверке пароля: {e}")
+        logger.error("Ошибка при проверке пароля: {}", e)
         return False
 
 
+async def hash_password_async(password: str) -> str:
+    """Хеширование пароля в пуле bcrypt, не блокируя event loop"""
+    return await password_pool.run(hash_password, password)
+
+
+async def validate_password_async(password: str, hashed_password: str) -> bool:
+    """Проверка пароля в пуле bcrypt, не блокируя event loop"""
+    return await password_pool.run(validate_password, password, hashed_password)
+
+
 async def authenticate_user(user, password):
     if not user:
         logger.error("Пользователь не найден")
         return None
-    if validate_password(password=password, hashed_password=user.password) is False:
+    if (
+        await validate_password_async(password=password, hashed_password=user.password)
+        is False
+    ):
         logger.error("Неверный пароль")
         return None
     return user
@@ -0,0 +1,111 @@
+"""Сравнение скорости подписи и проверки JWT для разных алгоритмов.
+
+Запуск из директории app:
+    python -m benchmarks.jwt_algorithms --iterations 2000
+
+Ключи генерируются на лету, поэтому настройки приложения и БД не нужны.
+Для каждого алгоритма замеряются подпись и проверка с готовыми объектами
+ключей (как в приложении) и с PEM-строками (как было раньше).
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+KEY_GENERATORS: dict[str, Callable] = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def to_pem(private_key) -> tuple[bytes, bytes]:
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem, public_pem
+
+
+def ops_per_second(func: Callable[[], object], iterations: int) -> float:
+    func()  # прогрев
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def bench_algorithm(algorithm: str, iterations: int) -> dict:
+    """Замер подписи и проверки токена одним алгоритмом
+    Args:
+        algorithm (str): алгоритм подписи
+        iterations (int): количество операций в замере
+    Returns:
+        dict: операций в секунду для каждого варианта
+    """
+    private_key = KEY_GENERATORS[algorithm]()
+    public_key = private_key.public_key()
+    private_pem, public_pem = to_pem(private_key)
+    payload = {
+        "sub": "1",
+        "type": "access",
+        "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+    }
+    token = jwt.encode(payload, private_key, algorithm=algorithm)
+    return {
+        "algorithm": algorithm,
+        "token_size": len(token),
+        "sign_key_object": ops_per_second(
+            lambda: jwt.encode(payload, private_key, algorithm=algorithm), iterations
+        ),
+        "sign_pem": ops_per_second(
+            lambda: jwt.encode(payload, private_pem, algorithm=algorithm), iterations
+        ),
+        "verify_key_object": ops_per_second(
+            lambda: jwt.decode(token, public_key, algorithms=[algorithm]), iterations
+        ),
+        "verify_pem": ops_per_second(
+            lambda: jwt.decode(token, public_pem, algorithms=[algorithm]), iterations
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк алгоритмов подписи JWT")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument(
+        "--algorithms", nargs="+", default=list(KEY_GENERATORS), choices=KEY_GENERATORS
+    )
+    parser.add_argument("--json", action="store_true", help="Вывод в формате JSON")
+    args = parser.parse_args()
+
+    results = [bench_algorithm(name, args.iterations) for name in args.algorithms]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    columns = ("sign_key_object", "sign_pem", "verify_key_object", "verify_pem")
+    print(f"{'algorithm':<10}{'token':>7}" + "".join(f"{c:>19}" for c in columns))
+    for result in results:
+        print(
+            f"{result['algorithm']:<10}{result['token_size']:>7}"
+            + "".join(f"{result[c]:>19.0f}" for c in columns)
+        )
+    # вход и обновление токенов подписывают пару access + refresh
+    print("\nпар токенов в секунду (login/refresh):")
+    for result in results:
+        print(f"  {result['algorithm']:<8}{result['sign_key_object'] / 2:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""Нагрузочный бенчмарк основных маршрутов приложения.
+
+Запуск из директории app против локальной Postgres из APP_CONFIG__DB__URL
+(миграции должны быть применены):
+    python -m benchmarks.load --cards 50 --users 20 --output baseline.json
+    python -m benchmarks.load --compare baseline.json
+
+Приложение поднимается в этом же процессе: main.main_app с lifespan
+вызывается через ASGI-транспорт httpx, без сети и uvicorn, поэтому цифры
+показывают стоимость самого приложения и БД. Перед прогоном в базу
+добавляются карточки и пользователи с меткой BENCH_MARKER, после прогона
+они удаляются (--keep-data оставляет их для повторных запусков).
+
+Результат - JSON с пропускной способностью и задержками p50/p95/p99 по
+каждому сценарию; --compare печатает изменения относительно прошлого прогона.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+# логи каждого запроса исказили бы замер
+os.environ.setdefault("APP_CONFIG__LOGGING__LEVEL", "WARNING")
+
+BENCH_MARKER = "bench:"
+BENCH_EMAIL_DOMAIN = "benchmark.example.com"
+BENCH_PASSWORD = "bench-password"
+
+
+@dataclass
+class Seed:
+    """Сид-данные, с которыми работают сценарии"""
+
+    # таблица карточек -> id секции и id добавленных карточек
+    sections: dict[str, int]
+    card_ids: dict[str, list[int]]
+    emails: list[str]
+    # секции, которых не было в базе и которые нужно удалить после прогона
+    created_sections: list[int] = field(default_factory=list)
+
+
+def percentile(values: list[float], rank: float) -> float:
+    """Процентиль по ближайшему рангу (values отсортированы)"""
+    if not values:
+        return 0.0
+    index = max(int(round(rank / 100 * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(latencies: list[float], statuses: dict[int, int], elapsed: float):
+    latencies = sorted(latencies)
+    errors = sum(count for code, count in statuses.items() if code >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": (
+                round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0
+            ),
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+async def seed_data(cards: int, users: int) -> Seed:
+    """Добавление секций, карточек и пользователей для прогона
+    Args:
+        cards (int): карточек на каждую секцию
+        users (int): пользователей для сценариев входа
+    Returns:
+        Seed: id карточек по таблицам и email пользователей
+    """
+    from auth.schemas import SUserAddDB
+    from auth.utils import hash_password
+    from core import db_helper as db
+    from crud.cards import cards_dao_map
+    from crud.sections import (ORDER_GAP, commit_content, get_order_value,
+                               sections_map)
+    from crud.users import UsersDAO
+    from sections.models import Section, models_map
+    from sections.schemas import CardCreate
+
+    seed = Seed(sections=dict(sections_map), card_ids={}, emails=[])
+    async with db.session_factory() as session:
+        for table_name, section_id in sections_map.items():
+            if await session.get(Section, section_id) is None:
+                session.add(Section(id=section_id, title=f"{BENCH_MARKER}{table_name}"))
+                seed.created_sections.append(section_id)
+        await session.flush()
+        for table_name, section_id in sections_map.items():
+            start = await get_order_value(
+                models_map[table_name], section_id, session=session
+            )
+            rows = await cards_dao_map[table_name](session).add_many(
+                [
+                    CardCreate(
+                        section_id=section_id,
+                        table_name=table_name,
+                        title=f"{BENCH_MARKER}{table_name} {index}",
+                        description="Карточка нагрузочного теста " * 4,
+                        order_value=start + ORDER_GAP * (index + 1),
+                    )
+                    for index in range(cards)
+                ],
+                return_rows=True,
+            )
+            seed.card_ids[table_name] = [row.id for row in rows]
+        # bcrypt дорогой, хеш один на всех
+        hashed = hash_password(BENCH_PASSWORD)
+        seed.emails = [
+            f"{BENCH_MARKER.rstrip(':')}-{index}-{time.time_ns()}@{BENCH_EMAIL_DOMAIN}"
+            for index in range(users)
+        ]
+        await UsersDAO(session).add_many(
+            [
+                SUserAddDB(
+                    email=email, first_name="Bench", last_name="Bench", password=hashed
+                )
+                for email in seed.emails
+            ]
+        )
+        await commit_content(session=session)
+    return seed
+
+
+async def cleanup_data(seed: Seed) -> None:
+    """Удаление всего, что помечено BENCH_MARKER (включая созданное сценариями)"""
+    from core import db_helper as db
+    from crud.sections import commit_content, sections_map
+    from sections.models import Section, models_map
+    from sqlalchemy import delete
+    from users.models import User
+
+    async with db.session_factory() as session:
+        for table_name in sections_map:
+            model = models_map[table_name]
+            await session.execute(
+                delete(model).where(model.title.startswith(BENCH_MARKER))
+            )
+        await session.execute(
+            delete(User).where(User.email.endswith(f"@{BENCH_EMAIL_DOMAIN}"))
+        )
+        if seed.created_sections:
+            await session.execute(
+                delete(Section).where(Section.id.in_(seed.created_sections))
+            )
+        await commit_content(session=session)
+
+
+# Сценарий: один запрос к приложению, номер итерации - для выбора данных
+Scenario = Callable[[httpx.AsyncClient, Seed, int], Awaitable[httpx.Response]]
+
+
+async def landing(client: httpx.AsyncClient, seed: Seed, index: int):
+    return await client.get("/")
+
+
+async def admin_page(client: httpx.AsyncClient, seed: Seed, index: int):
+    return await client.get("/admin/")
+
+
+async def login(client: httpx.AsyncClient, seed: Seed, index: int):
+    return await client.post(
+        "/api/auth/login/",
+        json={
+            "email": seed.emails[index % len(seed.emails)],
+            "password": BENCH_PASSWORD,
+        },
+    )
+
+
+async def update_card(client: httpx.AsyncClient, seed: Seed, index: int):
+    table_name = random.choice(list(seed.card_ids))
+    card_id = random.choice(seed.card_ids[table_name])
+    return await client.patch(
+        f"/admin/{table_name}/{card_id}",
+        json={
+            "id": card_id,
+            "table_name": table_name,
+            "title": f"{BENCH_MARKER}{table_name} {index}",
+        },
+    )
+
+
+async def create_card(client: httpx.AsyncClient, seed: Seed, index: int):
+    table_name = random.choice(list(seed.card_ids))
+    return await client.post(
+        f"/admin/sections/{table_name}",
+        json={
+            "section_id": seed.sections[table_name],
+            "table_name": table_name,
+            "title": f"{BENCH_MARKER}{table_name} new {index}",
+        },
+    )
+
+
+async def reorder_cards(client: httpx.AsyncClient, seed: Seed, index: int):
+    table_name = random.choice(list(seed.card_ids))
+    card_id, after_id = random.sample(seed.card_ids[table_name], 2)
+    return await client.post(
+        f"/admin/sections/{table_name}/reorder",
+        json={"moves": [{"id": card_id, "after_id": after_id}]},
+    )
+
+
+SCENARIOS: dict[str, tuple[Scenario, bool]] = {
+    # имя: (сценарий, нужен ли вход под пользователем)
+    "landing": (landing, False),
+    "admin_page": (admin_page, True),
+    "login": (login, False),
+    "admin_update_card": (update_card, True),
+    "admin_create_card": (create_card, True),
+    "admin_reorder": (reorder_cards, True),
+}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    seed: Seed,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """Прогон сценария заданным числом одновременных клиентов
+    Args:
+        client (httpx.AsyncClient): клиент приложения
+        scenario (Scenario): сценарий
+        seed (Seed): сид-данные
+        requests (int): всего запросов
+        concurrency (int): одновременных запросов
+    Returns:
+        dict: пропускная способность, задержки и коды ответов
+    """
+    counter = itertools.count()
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    async def worker() -> None:
+        while (index := next(counter)) < requests:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, seed, index)
+                code = response.status_code
+            except Exception:
+                code = 599
+            latencies.append(time.perf_counter() - started)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from core.cache import page_cache
+    from main import main_app
+
+    random.seed(args.random_seed)
+    if args.no_page_cache:
+        page_cache.enabled = False
+    results = {}
+    async with main_app.router.lifespan_context(main_app):
+        seed = await seed_data(cards=args.cards, users=args.users)
+        try:
+            for name in args.scenarios:
+                scenario, needs_login = SCENARIOS[name]
+                async with httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=main_app),
+                    base_url="http://benchmark",
+                ) as client:
+                    if needs_login:
+                        response = await login(client, seed, 0)
+                        response.raise_for_status()
+                    # прогрев: кэши страниц, пулы соединений, компиляция запросов
+                    await run_scenario(
+                        client, scenario, seed, args.warmup, args.concurrency
+                    )
+                    results[name] = await run_scenario(
+                        client, scenario, seed, args.requests, args.concurrency
+                    )
+                print(
+                    f"{name:<20}{results[name]['rps']:>10.1f} rps"
+                    f"{results[name]['latency_ms']['p50']:>10.2f}"
+                    f"{results[name]['latency_ms']['p95']:>10.2f}"
+                    f"{results[name]['latency_ms']['p99']:>10.2f} ms"
+                    f"{results[name]['errors']:>8} err"
+                )
+        finally:
+            if not args.keep_data:
+                await cleanup_data(seed)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cards": args.cards,
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "random_seed": args.random_seed,
+            "page_cache": not args.no_page_cache,
+        },
+        "results": results,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Печать изменений пропускной способности и p95 относительно базового прогона"""
+    print(
+        f"\nсравнение с {baseline['meta'].get('commit')}"
+        f" ({baseline['meta'].get('created_at')}):"
+    )
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"  {name:<20} нет в базовом прогоне")
+            continue
+        rps = (result["rps"] / before["rps"] - 1) * 100 if before["rps"] else 0.0
+        p95_before = before["latency_ms"]["p95"]
+        p95 = (
+            (result["latency_ms"]["p95"] / p95_before - 1) * 100 if p95_before else 0.0
+        )
+        print(f"  {name:<20} rps {rps:>+8.1f}%   p95 {p95:>+8.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк маршрутов")
+    parser.add_argument("--cards", type=int, default=30, help="Карточек на секцию")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument(
+        "--requests", type=int, default=300, help="Запросов на сценарий"
+    )
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS
+    )
+    parser.add_argument(
+        "--no-page-cache",
+        action="store_true",
+        help="Рендерить лендинг на каждый запрос",
+    )
+    parser.add_argument(
+        "--keep-data", action="store_true", help="Не удалять сид-данные после прогона"
+    )
+    parser.add_argument(
+        "--random-seed", type=int, default=0, help="Выбор карточек в сценариях"
+    )
+    parser.add_argument("--output", type=Path, help="Сохранить результат в JSON")
+    parser.add_argument("--compare", type=Path, help="JSON базового прогона")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Микробенчмарки функций горячего пути со сравнением с базовым прогоном.
+
+Запуск из директории app (нужны настройки приложения, соединение с БД - нет):
+    python -m benchmarks.micro --output micro-baseline.json
+    python -m benchmarks.micro --baseline micro-baseline.json --threshold 0.2
+
+Каждая функция вызывается пачками, размер пачки подбирается так, чтобы
+пачка шла не меньше --min-time секунд; из --repeat пачек берутся медиана
+и минимум времени одного вызова. С --baseline медиана сравнивается
+с базовой, и при замедлении больше порога команда завершается с кодом 1.
+Базовый прогон имеет смысл сравнивать только с прогоном на той же машине.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+# Подготовка бенчмарка: возвращает функцию без аргументов, которую замеряем
+Setup = Callable[[], Callable[[], object]]
+
+BENCHMARKS: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Регистрация подготовки бенчмарка под именем"""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def synthetic_sections(cards: int) -> dict:
+    """Секции с карточками без БД, в том виде, в каком их отдает get_all"""
+    from crud.sections import sections_map
+    from sections.models import Section, models_map
+
+    variants = {
+        image_type: {
+            image_format: [
+                {"width": width, "url": f"/static/{image_type}-{width}.{image_format}"}
+                for width in (480, 960, 1440)
+            ]
+            for image_format in ("avif", "webp")
+        }
+        for image_type in ("image_desktop", "image_mobile")
+    }
+    data = {}
+    for table_name, section_id in sections_map.items():
+        section = Section(id=section_id, title=f"Секция {table_name}")
+        setattr(
+            section,
+            table_name,
+            [
+                models_map[table_name](
+                    id=index,
+                    section_id=section_id,
+                    title=f"Карточка {index}",
+                    description="Описание карточки " * 10,
+                    image_desktop=f"/static/desktop-{index}.jpg",
+                    image_mobile=f"/static/mobile-{index}.jpg",
+                    image_alt=f"Картинка {index}",
+                    image_variants=variants,
+                    button_text="Подробнее",
+                    button_url="/",
+                    order_value=index * 1024,
+                )
+                for index in range(cards)
+            ],
+        )
+        data[table_name] = section
+    return data
+
+
+@benchmark("base.to_dict")
+def bench_to_dict():
+    card = synthetic_sections(1)["achievements"].achievements[0]
+    card.created_at = card.updated_at = datetime.now()
+    return card.to_dict
+
+
+@benchmark("jwt.encode")
+def bench_encode_jwt():
+    from auth.utils import encode_jwt
+
+    payload = {"sub": "1", "type": "access"}
+    return lambda: encode_jwt(payload=payload)
+
+
+@benchmark("jwt.decode")
+def bench_decode_jwt():
+    from auth.utils import decode_jwt, encode_jwt
+
+    token = encode_jwt(payload={"sub": "1", "type": "access"})
+    return lambda: decode_jwt(token=token)
+
+
+@benchmark("password.hash")
+def bench_hash_password():
+    from auth.utils import hash_password
+
+    return lambda: hash_password("bench-password")
+
+
+@benchmark("password.validate")
+def bench_validate_password():
+    from auth.utils import hash_password, validate_password
+
+    hashed = hash_password("bench-password")
+    return lambda: validate_password("bench-password", hashed)
+
+
+@benchmark("templates.landing")
+def bench_landing_render():
+    from core.templates import landing
+
+    template = landing.get_template("index.html")
+    context = {"request": None, **synthetic_sections(30)}
+    return lambda: template.render(context)
+
+
+@benchmark("schemas.entity_update")
+def bench_entity_update():
+    from sections.schemas import EntityUpdate
+
+    payload = {
+        "id": 1,
+        "table_name": "achievements",
+        "title": "Заголовок",
+        "description": "Описание " * 20,
+        "button_text": "Подробнее",
+        "button_url": "/",
+    }
+    return lambda: EntityUpdate.model_validate(payload).model_dump(exclude_unset=True)
+
+
+@benchmark("schemas.card_create")
+def bench_card_create():
+    from sections.schemas import CardCreate
+
+    payload = {"section_id": 1, "table_name": "products", "title": "Карточка"}
+    return lambda: CardCreate.model_validate(payload)
+
+
+@benchmark("schemas.cards_reorder")
+def bench_cards_reorder():
+    from sections.schemas import CardsReorder
+
+    payload = {"moves": [{"id": i, "after_id": i + 1} for i in range(50)]}
+    return lambda: CardsReorder.model_validate(payload)
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> dict:
+    """Время одного вызова функции
+    Args:
+        func (Callable): замеряемая функция
+        repeat (int): количество пачек
+        min_time (float): минимальная длительность пачки, секунды
+    Returns:
+        dict: медиана и минимум в микросекундах, размер пачки
+    """
+    func()  # прогрев: импорты, кэши шаблонов и схем
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time:
+            break
+        number *= 2
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "min_us": round(min(timings) * 1e6, 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Сравнение медиан с базовым прогоном
+    Args:
+        baseline (dict): результаты базового прогона
+        current (dict): результаты текущего прогона
+        threshold (float): допустимое замедление, доля (0.2 - на 20%)
+    Returns:
+        list[str]: имена бенчмарков, замедлившихся больше порога
+    """
+    regressions = []
+    print(f"\n{'benchmark':<26}{'baseline, us':>14}{'current, us':>14}{'change':>10}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<26}{'-':>14}{result['median_us']:>14.2f}{'new':>10}")
+            continue
+        change = result["median_us"] / before["median_us"] - 1
+        mark = ""
+        if change > threshold:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        print(
+            f"{name:<26}{before['median_us']:>14.2f}{result['median_us']:>14.2f}"
+            f"{change * 100:>+9.1f}%{mark}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Микробенчмарки горячих функций")
+    parser.add_argument(
+        "--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--output", type=Path, help="Сохранить результат в JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON базового прогона")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Допустимое замедление, доля"
+    )
+    args = parser.parse_args()
+
+    from core.config import LoggingConfig
+    from core.logs import setup_logging
+
+    # отладочные сообщения горячих функций не должны попадать в замер
+    setup_logging(LoggingConfig(level="WARNING", enqueue=False))
+    results = {}
+    for name in args.only:
+        results[name] = measure(BENCHMARKS[name](), args.repeat, args.min_time)
+        print(
+            f"{name:<26}{results[name]['median_us']:>14.2f} us"
+            f"  (min {results[name]['min_us']:.2f}, x{results[name]['number']})"
+        )
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.baseline:
+        regressions = compare(
+            json.loads(args.baseline.read_text()), report, args.threshold
+        )
+        if regressions:
+            print(f"\nзамедление больше {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from core import db_helper as db
+from core.assets import build_assets
+from core.config import settings
+from crud.publish import landing_publisher
+from crud.uploads_gc import uploads_collector
+from loguru import logger
+
+
+async def publish() -> None:
+    async with db.session_factory() as session:
+        path = await landing_publisher.publish(session=session)
+    logger.info(f"Статическая версия лендинга: /{path.as_posix()}")
+    await db.dispose()
+
+
+async def gc_uploads(dry_run: bool = False) -> None:
+    orphans = await uploads_collector.collect(dry_run=dry_run)
+    for url in orphans:
+        logger.info(f"{'Найден' if dry_run else 'Обработан'} файл-сирота: {url}")
+    await db.dispose()
+
+
+async def build_static() -> None:
+    base_dir = Path(settings.files.base_dir)
+    build_assets(
+        static_dir=base_dir / settings.files.static_files,
+        sources=settings.files.assets_sources,
+        output_dir=base_dir / settings.files.assets_dir,
+        manifest_path=base_dir / settings.files.assets_manifest,
+        compress_suffixes=settings.files.assets_compress_suffixes,
+        compress_min_size=settings.files.assets_compress_min_size,
+    )
+
+
+commands = {
+    "publish": publish,
+    "gc-uploads": gc_uploads,
+    "build-assets": build_static,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Служебные команды приложения")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("publish", help="Опубликовать лендинг в статический HTML")
+    gc_parser = subparsers.add_parser(
+        "gc-uploads", help="Удалить загруженные файлы, на которые нет ссылок"
+    )
+    gc_parser.add_argument(
+        "--dry-run", action="store_true", help="Только показать файлы-сироты"
+    )
+    subparsers.add_parser(
+        "build-assets", help="Собрать статику с хешем в именах и сжатыми копиями"
+    )
+    args = parser.parse_args()
+    options = {key: value for key, value in vars(args).items() if key != "command"}
+    asyncio.run(commands[args.command](**options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path, PurePosixPath
+
+from core.config import settings
+from loguru import logger
+
+try:
+    import brotli
+except ImportError:  # без brotli собираем только gzip
+    brotli = None
+
+# Сжатые копии файла: кодировка из Accept-Encoding -> расширение на диске
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+# Ссылки на статику внутри css, например url("/static/landing/img/bg.jpg")
+CSS_URL_PATTERN = re.compile(r"""url\((['"]?)/static/([^'")?#]+)\1\)""")
+
+
+class AssetManifest:
+    """Соответствие исходных путей статики и их версий с хешем в имени.
+
+    Пока сборка не выполнялась, ссылки ведут на исходные файлы, поэтому
+    локальная разработка работает без дополнительных шагов.
+    """
+
+    def __init__(self, path: Path, prefix: str = "/static") -> None:
+        self.path = path
+        self.prefix = prefix
+        self.assets: dict[str, str] = {}
+        self.encodings: dict[str, list[str]] = {}
+        self.version = ""
+        self.load()
+
+    def load(self) -> None:
+        """Чтение манифеста, собранного командой build-assets"""
+        if not self.path.is_file():
+            return
+        raw = self.path.read_bytes()
+        manifest = json.loads(raw)
+        self.assets = manifest["assets"]
+        self.encodings = manifest["encodings"]
+        # версия манифеста входит в ETag страниц, ссылающихся на статику
+        self.version = hashlib.sha1(raw).hexdigest()
+        logger.info(f"Манифест статики загружен: {len(self.assets)} файлов")
+
+    def url(self, path: str) -> str:
+        """URL файла статики для шаблонов
+        Args:
+            path (str): путь относительно директории статики
+        Returns:
+            str: URL версии с хешем в имени или исходного файла
+        """
+        return f"{self.prefix}/{self.assets.get(path, path)}"
+
+    def available_encodings(self, path: str) -> list[str]:
+        """Кодировки, для которых собраны сжатые копии файла"""
+        return self.encodings.get(PurePosixPath(path).as_posix(), [])
+
+
+def file_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:12]
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=11)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def build_assets(
+    static_dir: Path,
+    sources: list[str],
+    output_dir: Path,
+    manifest_path: Path,
+    compress_suffixes: list[str],
+    compress_min_size: int,
+) -> dict[str, str]:
+    """Сборка статики: копии с хешем содержимого в имени и сжатые версии
+    Args:
+        static_dir (Path): директория статики, отдаваемая по /static
+        sources (list[str]): директории внутри статики, которые собираем
+        output_dir (Path): директория собранных файлов внутри статики
+        manifest_path (Path): куда записать манифест
+        compress_suffixes (list[str]): расширения файлов, которые стоит сжимать
+        compress_min_size (int): файлы меньше этого размера не сжимаем
+    Returns:
+        dict[str, str]: {исходный путь: путь с хешем} относительно статики
+    """
+    files = sorted(
+        path
+        for source in sources
+        for path in Path(static_dir, source).rglob("*")
+        if path.is_file()
+    )
+    # css ссылается на шрифты и картинки, поэтому собирается последним
+    files.sort(key=lambda path: path.suffix == ".css")
+    assets, encodings = {}, {}
+    for path in files:
+        source = path.relative_to(static_dir).as_posix()
+        content = path.read_bytes()
+        if path.suffix == ".css":
+            content = CSS_URL_PATTERN.sub(
+                lambda match: (
+                    f"url({match[1]}/static/"
+                    f"{assets.get(match[2], match[2])}{match[1]})"
+                ),
+                content.decode(),
+            ).encode()
+        relative = Path(source).with_name(
+            f"{path.stem}.{file_hash(content)}{path.suffix}"
+        )
+        # старые версии не удаляем: на них еще ссылаются страницы в кэшах
+        target = output_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        built = target.relative_to(static_dir).as_posix()
+        assets[source] = built
+        if path.suffix not in compress_suffixes or len(content) < compress_min_size:
+            continue
+        for encoding, extension in ENCODINGS.items():
+            if encoding == "br" and brotli is None:
+                continue
+            compressed = compress(content, encoding)
+            # сжатие, которое почти ничего не дает, не стоит лишнего файла
+            if len(compressed) < len(content) * 0.9:
+                Path(f"{target}{extension}").write_bytes(compressed)
+                encodings.setdefault(built, []).append(encoding)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps({"assets": assets, "encodings": encodings}, indent=2)
+    )
+    logger.info(f"Собрано {len(assets)} файлов статики в {output_dir}")
+    return assets
+
+
+asset_manifest = AssetManifest(
+    path=Path(settings.files.base_dir, settings.files.assets_manifest)
+)
@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from core.config import settings
+from loguru import logger
+
+
+class CachedPage(NamedTuple):
+    html: str
+    etag: str
+    last_modified: datetime | None
+
+
+class PageCache:
+    """Кэш отрендеренных HTML-страниц.
+
+    Ключ записи - имя шаблона и версия контента. Любая запись в секции
+    увеличивает версию, поэтому страницы, отрендеренные до изменения,
+    становятся недоступны даже если рендер завершился уже после инвалидации.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.version = 0
+        self._pages: dict[tuple[str, int], CachedPage] = {}
+
+    def get(self, template_name: str) -> CachedPage | None:
+        """Получение страницы для текущей версии контента
+        Args:
+            template_name (str): имя шаблона
+        Returns:
+            CachedPage | None: страница или None, если в кэше ее нет
+        """
+        if not self.enabled:
+            return None
+        return self._pages.get((template_name, self.version))
+
+    def set(self, template_name: str, page: CachedPage, version: int) -> None:
+        """Сохранение страницы
+        Args:
+            template_name (str): имя шаблона
+            page (CachedPage): отрендеренная страница и ее валидаторы
+            version (int): версия контента, с которой страница рендерилась
+        """
+        if not self.enabled or version != self.version:
+            # за время рендера контент успел измениться
+            return
+        self._pages[(template_name, version)] = page
+
+    def invalidate(self) -> None:
+        """Сброс всех страниц после изменения контента"""
+        self.version += 1
+        self._pages.clear()
+        logger.info(f"Кэш страниц сброшен, версия контента: {self.version}")
+
+
+page_cache = PageCache(enabled=settings.cache.enabled)
@@ -1,6 +1,8 @@
+from ipaddress import ip_network
 from pathlib import Path
+from typing import Literal
 
-from pydantic import BaseModel, PostgresDsn
+from pydantic import BaseModel, IPvAnyNetwork, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).parent.parent
@@ -24,9 +26,18 @@ class ApiPrefix(BaseModel):
 class AuthJWT(BaseModel):
     private_key: Path = BASE_DIR / "certs" / "jwt-private.pem"
     public_key: Path = BASE_DIR / "certs" / "jwt-public.pem"
-    algorithm: str = "RS256"
+    algorithm: Literal["RS256", "ES256", "EdDSA"] = "RS256"
     token_expire_minutes: int = 60
     token_expire_days: int = 30
+    token_cache_enabled: bool = True
+    token_cache_size: int = 1024
+    token_cache_max_age: float = 60.0
+
+
+class PasswordConfig(BaseModel):
+    workers: int = 2
+    queue_size: int = 32
+    timeout: float = 5.0
 
 
 class DatabaseConfig(BaseModel):
@@ -35,6 +46,31 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    # сколько ждать свободное соединение, прежде чем отказать запросу
+    pool_timeout: float = 30.0
+    # пересоздание соединений старше, чем столько секунд (-1 - никогда)
+    pool_recycle: int = 1800
+    # проверка соединения при выдаче из пула: лишний round trip на каждый запрос,
+    # включать, если соединения рвутся между запросами (балансировщик, рестарты БД)
+    pool_pre_ping: bool = False
+    # воркер не готов принимать трафик, если при исчерпанном пуле
+    # соединения ждут больше запросов
+    ready_max_waiting: int = 10
+    ready_timeout: float = 1.0
+    # кэш скомпилированных SQLAlchemy запросов
+    query_cache_size: int = 500
+    # кэш подготовленных выражений asyncpg на каждом соединении
+    statement_cache_size: int = 100
+    # режим для PgBouncer в режиме транзакций: без именованных prepared statements
+    pgbouncer: bool = False
+    # реплики для запросов только на чтение
+    replica_urls: list[PostgresDsn] = []
+    replica_connect_timeout: float = 1.0
+    # через сколько секунд снова пробовать недоступную реплику
+    replica_retry_after: float = 30.0
+    # после изменений клиент читает с primary, пока реплики догоняют
+    primary_pin_cookie: str = "db_primary"
+    primary_pin_seconds: int = 5
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -59,6 +95,80 @@ class FilesConfig(BaseModel):
         "image/webp",
     ]
     alloewd_image_actions: list[str] = ["image_delete", "image_refresh"]
+    max_image_size: int = 10 * 1024 * 1024
+    upload_chunk_size: int = 256 * 1024
+    uploads_gc_grace: int = 24 * 3600
+    uploads_gc_interval: int = 0
+    uploads_quarantine: str | None = None
+    image_variant_widths: list[int] = [480, 960, 1440]
+    image_variant_formats: list[str] = ["avif", "webp"]
+    image_variant_quality: int = 80
+    image_workers: int = 2
+    published_landing: str = "static/landing/published/index.html"
+    publish_on_change: bool = False
+    publish_delay: float = 1.0
+    assets_sources: list[str] = [
+        "landing/css",
+        "landing/fonts",
+        "landing/img",
+        "landing/js",
+        "admin/js",
+    ]
+    assets_dir: str = "static/dist"
+    assets_manifest: str = "assets-manifest.json"
+    assets_compress_suffixes: list[str] = [".css", ".js", ".svg", ".ttf"]
+    assets_compress_min_size: int = 1024
+
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    invalidation_enabled: bool = True
+    invalidation_channel: str = "content_version"
+    invalidation_reconnect_delay: float = 5.0
+    # повторный сброс страниц, отрендеренных с отстающей реплики
+    replica_lag_grace: float = 2.0
+
+
+class LoggingConfig(BaseModel):
+    level: str = "INFO"
+    levels: dict[str, str] = {}
+    sample_rate: float = 0.01
+    enqueue: bool = True
+    serialize: bool = False
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = True
+    path: str = "/metrics"
+    # эндпоинт внутренний: остальным клиентам отвечаем 404
+    allowed_networks: list[IPvAnyNetwork] = [
+        ip_network("127.0.0.0/8"),
+        ip_network("::1/128"),
+    ]
+    buckets: list[float] = [
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+    ]
+
+
+class ProfilerConfig(BaseModel):
+    # счетчики на каждый запрос: включать в dev или временно в prod
+    enabled: bool = False
+    server_timing: bool = True
+    # сколько раз одно выражение за запрос считается вероятным N+1
+    n_plus_one_threshold: int = 5
+    max_queries: int = 50
+    statement_log_length: int = 300
 
 
 class Settings(BaseSettings):
@@ -72,7 +182,12 @@ class Settings(BaseSettings):
     run: RunConfig = RunConfig()
     api: ApiPrefix = ApiPrefix()
     auth: AuthJWT = AuthJWT()
+    passwords: PasswordConfig = PasswordConfig()
     files: FilesConfig = FilesConfig()
+    cache: CacheConfig = CacheConfig()
+    logging: LoggingConfig = LoggingConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    profiler: ProfilerConfig = ProfilerConfig()
     db: DatabaseConfig
 
 
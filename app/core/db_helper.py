@@ -1,6 +1,14 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from core.config import settings
+from core.pool_metrics import PoolMetrics, instrumented_pool_class
+from core.replicas import ReplicaEngine
+from fastapi import Request
+from loguru import logger
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     async_sessionmaker, create_async_engine)
 
@@ -13,23 +21,83 @@ class DatabaseHelper:
         echo_pool: bool = False,
         pool_size: int = 5,
         max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        query_cache_size: int = 500,
+        statement_cache_size: int = 100,
+        pgbouncer: bool = False,
+        replica_urls: list[str] = (),
+        replica_retry_after: float = 30.0,
+        replica_connect_timeout: float = 1.0,
+        pin_cookie: str = "db_primary",
     ) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            url=url,
+        self.engine_options = dict(
             echo=echo,
             echo_pool=echo_pool,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            query_cache_size=query_cache_size,
+            connect_args=self.connect_args(statement_cache_size, pgbouncer),
         )
+        self.pool_metrics = PoolMetrics()
+        self.engine: AsyncEngine = self.create_engine(url, self.pool_metrics)
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
+        # у каждой реплики свой пул, чтобы недоступная не занимала соединения других
+        self.replicas = [
+            ReplicaEngine(
+                name=f"replica-{index}",
+                engine=self.create_engine(str(replica_url), metrics := PoolMetrics()),
+                pool_metrics=metrics,
+            )
+            for index, replica_url in enumerate(replica_urls)
+        ]
+        self.replica_retry_after = replica_retry_after
+        self.replica_connect_timeout = replica_connect_timeout
+        self.pin_cookie = pin_cookie
+        self._next_replica = 0
+
+    def create_engine(self, url: str, metrics: PoolMetrics) -> AsyncEngine:
+        """Движок с общими настройками пула и сбором его метрик"""
+        engine = create_async_engine(
+            url=url,
+            poolclass=instrumented_pool_class(metrics),
+            **self.engine_options,
+        )
+        metrics.attach(engine)
+        return engine
+
+    @staticmethod
+    def connect_args(statement_cache_size: int, pgbouncer: bool) -> dict:
+        """Настройки подготовленных выражений asyncpg
+        Args:
+            statement_cache_size (int): размер кэша выражений на соединение
+            pgbouncer (bool): соединения идут через PgBouncer в режиме транзакций
+        Returns:
+            dict: connect_args для create_async_engine
+        """
+        if not pgbouncer:
+            return {"prepared_statement_cache_size": statement_cache_size}
+        # серверное соединение меняется между транзакциями, поэтому кэшировать
+        # выражения нельзя, а имена должны быть уникальными
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
 
     async def dispose(self) -> None:
         await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
@@ -56,6 +124,53 @@ class DatabaseHelper:
             finally:
                 await session.close()
 
+    async def get_read_session(
+        self, request: Request
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """Сессия только для чтения.
+
+        Идет на доступную реплику по кругу, а если реплик нет, все недоступны
+        или клиент недавно что-то менял (кука закрепления), то на primary.
+        """
+        session = None
+        if not request.cookies.get(self.pin_cookie):
+            session = await self._replica_session()
+        async with session or self.session_factory() as session:
+            try:
+                yield session
+            except Exception as e:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+
+    def read_session(self, request: Request):
+        """get_read_session в виде контекстного менеджера: соединение берется
+        только там, где запрос к БД действительно нужен
+        """
+        return asynccontextmanager(self.get_read_session)(request)
+
+    async def _replica_session(self) -> AsyncSession | None:
+        now = time.monotonic()
+        count = len(self.replicas)
+        for offset in range(count):
+            replica = self.replicas[(self._next_replica + offset) % count]
+            if replica.failed_until > now:
+                continue
+            session = replica.session_factory()
+            try:
+                # соединение берем сразу, чтобы переключиться до выполнения запроса
+                async with asyncio.timeout(self.replica_connect_timeout):
+                    await session.connection()
+            except Exception as e:
+                await session.close()
+                replica.failed_until = now + self.replica_retry_after
+                logger.warning(f"Реплика {replica.name} недоступна: {e!r}")
+                continue
+            self._next_replica = (self._next_replica + offset + 1) % count
+            return session
+        return None
+
 
 db_helper = DatabaseHelper(
     url=str(settings.db.url),
@@ -63,4 +178,14 @@ db_helper = DatabaseHelper(
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    pool_timeout=settings.db.pool_timeout,
+    pool_recycle=settings.db.pool_recycle,
+    pool_pre_ping=settings.db.pool_pre_ping,
+    query_cache_size=settings.db.query_cache_size,
+    statement_cache_size=settings.db.statement_cache_size,
+    pgbouncer=settings.db.pgbouncer,
+    replica_urls=settings.db.replica_urls,
+    replica_retry_after=settings.db.replica_retry_after,
+    replica_connect_timeout=settings.db.replica_connect_timeout,
+    pin_cookie=settings.db.primary_pin_cookie,
 )
@@ -53,5 +53,12 @@ class Exceptions:
         detail="Неверный формат токена. Ожидается 'Bearer <токен>'",
     )
 
+    # Пул проверки паролей перегружен
+    auth_overloaded = HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Сервис авторизации перегружен, повторите попытку позже",
+        headers={"Retry-After": "1"},
+    )
+
 
 exc = Exceptions()
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+
+from fastapi import Request, Response, status
+
+
+def templates_fingerprint(*directories: str) -> str:
+    """Отпечаток исходников шаблонов, чтобы ETag менялся и после деплоя
+    Args:
+        directories (str): директории шаблонов
+    Returns:
+        str: хеш содержимого всех файлов шаблонов
+    """
+    digest = hashlib.sha1()
+    for directory in directories:
+        for path in sorted(Path(directory).rglob("*")):
+            if path.is_file():
+                digest.update(path.as_posix().encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build_validator(state: list, salt: str) -> tuple[str, datetime | None]:
+    """Построение валидаторов ответа по срезу состояния контента
+    Args:
+        state (list): строки (таблица, количество записей, max(updated_at))
+        salt (str): отпечаток шаблонов
+    Returns:
+        tuple: ETag и Last-Modified
+    """
+    digest = hashlib.sha1(salt.encode())
+    last_modified = None
+    for table_name, count, updated_at in state:
+        digest.update(f"{table_name}:{count}:{updated_at};".encode())
+        if updated_at is not None:
+            # TIMESTAMP без зоны заполняется now() сервера БД в UTC
+            updated_at = updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+            if last_modified is None or updated_at > last_modified:
+                last_modified = updated_at
+    return f'"{digest.hexdigest()[:32]}"', last_modified
+
+
+def validator_headers(
+    etag: str, last_modified: datetime | None, cache_control: str
+) -> dict:
+    """Заголовки валидаторов для ответа"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime | None
+) -> bool:
+    """Проверка условного запроса (If-None-Match / If-Modified-Since)
+    Args:
+        request (Request): текущий запрос
+        etag (str): актуальный ETag
+        last_modified (datetime | None): время последнего изменения
+    Returns:
+        bool: True, если у клиента актуальная версия
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # при наличии If-None-Match заголовок If-Modified-Since игнорируется
+        if if_none_match.strip() == "*":
+            return True
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def not_modified_response(
+    etag: str, last_modified: datetime | None, cache_control: str
+) -> Response:
+    """Ответ 304 без тела"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified, cache_control),
+    )
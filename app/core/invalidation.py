@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from typing import Callable
+
+from core.cache import page_cache
+from core.config import settings
+from core.db_helper import db_helper
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+class InvalidationBus:
+    """Шина инвалидации локальных кэшей между воркерами.
+
+    Писатель публикует изменение версии контента через NOTIFY в своей
+    транзакции, поэтому оповещение уходит только после коммита. Каждый воркер
+    держит соединение с LISTEN и сбрасывает подписанные кэши при оповещении
+    от других воркеров.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        channel: str,
+        enabled: bool = True,
+        reconnect_delay: float = 5.0,
+        lag_grace: float = 0.0,
+    ) -> None:
+        self.engine = engine
+        self.channel = channel
+        self.enabled = enabled
+        self.reconnect_delay = reconnect_delay
+        # задержка повторного сброса, пока реплики догоняют primary
+        self.lag_grace = lag_grace
+        # идентификатор воркера, чтобы не сбрасывать кэш на свои же оповещения
+        self.instance_id = uuid.uuid4().hex
+        self._subscribers: list[Callable[[], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Регистрация функции сброса локального кэша"""
+        self._subscribers.append(callback)
+
+    async def publish(self, session: AsyncSession) -> None:
+        """Публикация изменения контента в рамках текущей транзакции
+        Args:
+            session (AsyncSession): сессия, в которой выполняется запись
+        """
+        if not self.enabled:
+            return
+        await session.execute(select(func.pg_notify(self.channel, self.instance_id)))
+
+    async def start(self) -> None:
+        """Запуск фонового слушателя"""
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._listen())
+        logger.info(f"Слушатель инвалидации запущен на канале {self.channel}")
+
+    async def stop(self) -> None:
+        """Остановка фонового слушателя"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Слушатель инвалидации остановлен")
+
+    def evict_local(self) -> None:
+        """Сброс всех подписанных кэшей текущего воркера.
+
+        При чтении с реплик страница, отрендеренная сразу после сброса, может
+        попасть в кэш со старыми данными отстающей реплики, поэтому через
+        lag_grace секунд кэши сбрасываются еще раз.
+        """
+        self._evict()
+        if self.lag_grace > 0:
+            asyncio.get_running_loop().call_later(self.lag_grace, self._evict)
+
+    def _evict(self) -> None:
+        for callback in self._subscribers:
+            callback()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        if payload == self.instance_id:
+            # локальный кэш уже сброшен писателем
+            return
+        logger.info(f"Получено оповещение об изменении контента от {payload}")
+        self.evict_local()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.engine.connect() as conn:
+                    raw_connection = await conn.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    connection_lost = asyncio.Event()
+                    driver_connection.add_termination_listener(
+                        lambda _: connection_lost.set()
+                    )
+                    await driver_connection.add_listener(self.channel, self._on_notify)
+                    # пока слушателя не было, оповещения могли пройти мимо
+                    self.evict_local()
+                    try:
+                        await connection_lost.wait()
+                    finally:
+                        if not driver_connection.is_closed():
+                            await driver_connection.remove_listener(
+                                self.channel, self._on_notify
+                            )
+                logger.warning("Соединение слушателя инвалидации потеряно")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка слушателя инвалидации: {e}")
+            await asyncio.sleep(self.reconnect_delay)
+
+
+invalidation_bus = InvalidationBus(
+    engine=db_helper.engine,
+    channel=settings.cache.invalidation_channel,
+    enabled=settings.cache.invalidation_enabled,
+    reconnect_delay=settings.cache.invalidation_reconnect_delay,
+    lag_grace=settings.cache.replica_lag_grace if db_helper.replicas else 0.0,
+)
+invalidation_bus.subscribe(page_cache.invalidate)
@@ -0,0 +1,98 @@
+import random
+import sys
+
+from core.config import LoggingConfig, settings
+from loguru import logger
+
+
+class SampledLogger:
+    """Логгер горячего пути (чтения на каждый просмотр страницы).
+
+    Сообщения ниже WARNING пишутся с вероятностью sample_rate. Решение
+    принимается до вызова loguru, поэтому у отброшенных сообщений не
+    форматируются ни текст, ни аргументы. Предупреждения и ошибки
+    не теряются никогда.
+    """
+
+    def __init__(self, sample_rate: float = 1.0) -> None:
+        self.sample_rate = sample_rate
+        # запись ведется от имени вызывающего модуля, а не core.logs
+        self._logger = logger.opt(depth=1)
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def debug(self, message: str, *args, **kwargs) -> None:
+        if self._sampled():
+            self._logger.debug(message, *args, **kwargs)
+
+    def info(self, message: str, *args, **kwargs) -> None:
+        if self._sampled():
+            self._logger.info(message, *args, **kwargs)
+
+    def warning(self, message: str, *args, **kwargs) -> None:
+        self._logger.warning(message, *args, **kwargs)
+
+    def error(self, message: str, *args, **kwargs) -> None:
+        self._logger.error(message, *args, **kwargs)
+
+
+sampled_logger = SampledLogger()
+
+
+class LogFilter:
+    """Фильтр записей: минимальный уровень по модулю.
+
+    Уровень берется по самому длинному совпавшему префиксу имени модуля,
+    например {"crud": "WARNING", "crud.publish": "INFO"}.
+    """
+
+    def __init__(self, level: str, levels: dict[str, str]):
+        self.default = logger.level(level).no
+        self.levels = sorted(
+            ((module, logger.level(name).no) for module, name in levels.items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def min_level(self) -> int:
+        """Самый низкий уровень из настроек, с которым запись вообще создается"""
+        return min([self.default, *(no for _, no in self.levels)])
+
+    def __call__(self, record: dict) -> bool:
+        name = record["name"] or ""
+        level = next(
+            (
+                no
+                for module, no in self.levels
+                if name == module or name.startswith(f"{module}.")
+            ),
+            self.default,
+        )
+        return record["level"].no >= level
+
+
+def setup_logging(config: LoggingConfig = settings.logging) -> None:
+    """Замена синхронного вывода loguru на неблокирующий.
+
+    Запись в sink выполняет отдельный поток, а уровень обработчика равен
+    минимальному из настроек, поэтому отфильтрованные по уровню сообщения
+    с аргументами вида logger.debug("{}", value) даже не форматируются.
+    """
+    log_filter = LogFilter(level=config.level, levels=config.levels)
+    sampled_logger.sample_rate = config.sample_rate
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level=log_filter.min_level(),
+        filter=log_filter,
+        enqueue=config.enqueue,
+        serialize=config.serialize,
+        backtrace=False,
+        diagnose=False,
+    )
+
+
+async def shutdown_logging() -> None:
+    """Дожидаемся записи сообщений из очереди перед завершением"""
+    await logger.complete()
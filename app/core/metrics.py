@@ -0,0 +1,300 @@
+import bisect
+import time
+from typing import Callable, Iterable
+
+from core.config import settings
+from core.profiler import record_render
+from jinja2 import Template
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def escape_label(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple, **extra) -> str:
+    """Метки серии в виде {name="value",...}"""
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return (
+        "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+    )
+
+
+class Counter:
+    """Монотонно растущий счетчик с метками"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, value: float = 1, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{format_labels(self.labels, key)} {value}"
+
+
+class Histogram:
+    """Гистограмма длительностей в формате Prometheus (накопительные корзины)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...],
+        buckets: Iterable[float],
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # по метке: счетчики корзин (последняя - +Inf), сумма и количество
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels[name] for name in self.labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket
+                labels = format_labels(self.labels, key, le=bound)
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = format_labels(self.labels, key)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """Метрики процесса и их вывод в текстовом формате Prometheus.
+
+    Счетчики и гистограммы обновляются на горячем пути без блокировок:
+    все наблюдения делаются в потоке event loop. Значения, которые уже
+    хранятся в других объектах (например, состояние пулов), снимаются
+    функциями-сборщиками только в момент запроса метрик.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        # сборщики возвращают (имя, тип, описание, [(метки, значение)])
+        self._collectors: list[Callable[[], Iterable[tuple]]] = []
+
+    def counter(self, name: str, description: str, labels=()) -> Counter:
+        metric = Counter(name, description, tuple(labels))
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, description: str, labels=(), buckets=settings.metrics.buckets
+    ) -> Histogram:
+        metric = Histogram(name, description, tuple(labels), buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func: Callable[[], Iterable[tuple]]) -> None:
+        """Регистрация сборщика значений, снимаемых при каждом запросе метрик"""
+        self._collectors.append(func)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus 0.0.4"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for collect in self._collectors:
+            for name, kind, description, values in collect():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in values:
+                    label_names = tuple(labels)
+                    label_values = tuple(labels.values())
+                    lines.append(
+                        f"{name}{format_labels(label_names, label_values)} {value}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса",
+    labels=("method", "route", "status"),
+)
+query_duration = metrics.histogram(
+    "db_query_duration_seconds",
+    "Длительность выполнения SQL-выражения",
+    labels=("engine", "operation"),
+)
+query_errors = metrics.counter(
+    "db_query_errors_total",
+    "Количество SQL-выражений, завершившихся ошибкой",
+    labels=("engine", "operation"),
+)
+template_duration = metrics.histogram(
+    "template_render_duration_seconds",
+    "Длительность рендеринга шаблона Jinja2",
+    labels=("template",),
+)
+
+
+def route_label(scope: Scope) -> str:
+    """Шаблон маршрута вместо пути, чтобы число серий не зависело от URL"""
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", None) or route.path
+    if "endpoint" in scope:
+        # смонтированное приложение (статика): путь точки монтирования
+        return scope.get("root_path") or "/"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Замер длительности запросов по маршрутам"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route_label(scope),
+                status=str(status),
+            )
+
+
+def statement_operation(statement: str) -> str:
+    """Первое ключевое слово выражения: SELECT, INSERT, UPDATE..."""
+    operation = statement.lstrip().split(None, 1)
+    return operation[0].upper() if operation else "UNKNOWN"
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Замер выполнения каждого SQL-выражения движка
+    Args:
+        engine (AsyncEngine): движок базы данных
+        name (str): значение метки engine (primary, replica-0...)
+    """
+    target = engine.sync_engine
+
+    @event.listens_for(target, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        query_duration.observe(
+            time.perf_counter() - context._metrics_started,
+            engine=name,
+            operation=statement_operation(statement),
+        )
+
+    @event.listens_for(target, "handle_error")
+    def handle_error(context):
+        query_errors.inc(
+            engine=name, operation=statement_operation(context.statement or "")
+        )
+
+
+def pool_collector(database) -> Callable[[], Iterable[tuple]]:
+    """Сборщик состояния пулов primary и реплик из их PoolMetrics"""
+    gauges = (
+        ("db_pool_size", "gauge", "Размер пула", "size"),
+        ("db_pool_checked_out", "gauge", "Выданные соединения", "checked_out"),
+        ("db_pool_idle", "gauge", "Свободные соединения в пуле", "idle"),
+        ("db_pool_overflow", "gauge", "Соединения сверх размера пула", "overflow"),
+        ("db_pool_waiting", "gauge", "Запросы, ждущие соединение", "waiting"),
+        (
+            "db_pool_checkout_timeouts_total",
+            "counter",
+            "Отказы по таймауту ожидания соединения",
+            "timeouts",
+        ),
+        (
+            "db_pool_invalidations_total",
+            "counter",
+            "Инвалидированные соединения",
+            "invalidations",
+        ),
+    )
+
+    def collect():
+        snapshots = [
+            (
+                "primary",
+                database.pool_metrics.snapshot(database.engine.sync_engine.pool),
+            )
+        ] + [
+            (
+                replica.name,
+                replica.pool_metrics.snapshot(replica.engine.sync_engine.pool),
+            )
+            for replica in database.replicas
+        ]
+        for metric, kind, description, key in gauges:
+            yield metric, kind, description, [
+                ({"engine": name}, snapshot[key]) for name, snapshot in snapshots
+            ]
+
+    return collect
+
+
+def instrument_database(database) -> None:
+    """Замер запросов и состояние пулов всех движков DatabaseHelper"""
+    instrument_engine(database.engine, "primary")
+    for replica in database.replicas:
+        instrument_engine(replica.engine, replica.name)
+    metrics.collector(pool_collector(database))
+
+
+class TimedTemplate(Template):
+    """Шаблон Jinja2 с замером рендеринга.
+
+    Подключается через env.template_class, поэтому время учитывается и для
+    TemplateResponse, и для прямого вызова get_template(...).render().
+    Время попадает и в метрики, и в профиль текущего запроса.
+    """
+
+    def render(self, *args, **kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - started
+            template_duration.observe(duration, template=self.name or "<string>")
+            record_render(duration)
@@ -0,0 +1,116 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolMetrics:
+    """Метрики пула соединений одного движка.
+
+    Счетчики обновляются событиями пула SQLAlchemy, а ожидание соединения
+    замеряет пул из instrumented_pool_class: событий до выдачи соединения
+    у SQLAlchemy нет.
+    """
+
+    def __init__(self, samples: int = 1024) -> None:
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waiting = 0
+        # последние времена получения соединения, секунды
+        self.checkout_times: deque[float] = deque(maxlen=samples)
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """Подписка на события пула движка (переживает пересоздание пула)"""
+        target = engine.sync_engine
+        event.listen(target, "connect", self._on_connect)
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "checkin", self._on_checkin)
+        event.listen(target, "invalidate", self._on_invalidate)
+
+    @contextmanager
+    def waiting_for_checkout(self, blocked: bool):
+        """Замер получения соединения из пула
+        Args:
+            blocked (bool): пул исчерпан, и запрос встает в очередь ожидания.
+                Проверка соединения (pre-ping) и открытие нового соединения
+                ожиданием не считаются.
+        """
+        if blocked:
+            self.waiting += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            if blocked:
+                self.waiting -= 1
+            self.checkout_times.append(time.perf_counter() - started)
+
+    def snapshot(self, pool: Pool) -> dict:
+        """Текущее состояние пула и накопленные счетчики
+        Args:
+            pool (Pool): пул движка (engine.sync_engine.pool)
+        Returns:
+            dict: метрики для health-эндпоинта и мониторинга
+        """
+        times = sorted(self.checkout_times)
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "waiting": self.waiting,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "checkout_ms_avg": (
+                round(sum(times) / len(times) * 1000, 3) if times else 0.0
+            ),
+            "checkout_ms_p95": (
+                round(times[int(len(times) * 0.95) - 1] * 1000, 3) if times else 0.0
+            ),
+            "checkout_ms_max": round(times[-1] * 1000, 3) if times else 0.0,
+        }
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, proxy) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
+
+
+def instrumented_pool_class(metrics: PoolMetrics) -> type[AsyncAdaptedQueuePool]:
+    """Класс пула, замеряющий ожидание соединения.
+
+    Пул пересоздается через self.__class__, поэтому метрики передаются
+    замыканием, а не атрибутом экземпляра.
+    """
+
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def connect(self):
+            # без ограничения переполнения (max_overflow=-1) пул не ждет никогда
+            blocked = (
+                self._max_overflow >= 0
+                and self.checkedout() >= self.size() + self._max_overflow
+            )
+            with metrics.waiting_for_checkout(blocked):
+                return super().connect()
+
+    return InstrumentedPool
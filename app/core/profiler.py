@@ -0,0 +1,151 @@
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from core.config import ProfilerConfig, settings
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryShape:
+    count: int = 0
+    duration: float = 0.0
+
+
+@dataclass
+class RequestProfile:
+    """Запросы к БД и рендеринг шаблонов в рамках одного HTTP-запроса"""
+
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    render_time: float = 0.0
+    # текст выражения с плейсхолдерами -> сколько раз и сколько времени
+    shapes: dict[str, QueryShape] = field(default_factory=dict)
+
+    def record_query(self, statement: str, duration: float) -> None:
+        statement = WHITESPACE.sub(" ", statement).strip()
+        shape = self.shapes.get(statement)
+        if shape is None:
+            shape = self.shapes[statement] = QueryShape()
+        shape.count += 1
+        shape.duration += duration
+        self.queries += 1
+        self.db_time += duration
+
+    def repeated(self, threshold: int) -> list[tuple[str, QueryShape]]:
+        """Выражения, выполненные не меньше threshold раз: вероятные N+1"""
+        return sorted(
+            (
+                (sql, shape)
+                for sql, shape in self.shapes.items()
+                if shape.count >= threshold
+            ),
+            key=lambda item: item[1].count,
+            reverse=True,
+        )
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing (длительности в миллисекундах)"""
+        total = time.perf_counter() - self.started
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f"render;dur={self.render_time * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        )
+
+
+# Профиль текущего запроса; вне запроса (фоновые задачи, cli) - None
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def record_render(duration: float) -> None:
+    """Учет времени рендеринга шаблона в профиле текущего запроса"""
+    profile = current_profile.get()
+    if profile is not None:
+        profile.render_time += duration
+
+
+def profile_engine(engine: AsyncEngine) -> None:
+    """Учет выражений движка в профиле текущего запроса"""
+    target = engine.sync_engine
+
+    @event.listens_for(target, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context._profiler_started = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.record_query(
+                statement, time.perf_counter() - context._profiler_started
+            )
+
+
+def profile_database(database) -> None:
+    """Профилирование primary и всех реплик DatabaseHelper"""
+    profile_engine(database.engine)
+    for replica in database.replicas:
+        profile_engine(replica.engine)
+
+
+class ProfilerMiddleware:
+    """Профилирование запросов к БД на каждый HTTP-запрос.
+
+    Повторяющиеся выражения (одна и та же форма запроса, выполненная много
+    раз за запрос) попадают в лог как вероятные N+1, а итоги запроса
+    отдаются заголовком Server-Timing и видны в devtools браузера.
+    """
+
+    def __init__(self, app: ASGIApp, config: ProfilerConfig = settings.profiler):
+        self.app = app
+        self.config = config
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.config.server_timing:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", profile.server_timing().encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            self.report(scope, profile)
+
+    def report(self, scope: Scope, profile: RequestProfile) -> None:
+        for statement, shape in profile.repeated(self.config.n_plus_one_threshold):
+            logger.warning(
+                "Возможный N+1 в {} {}: выражение выполнено {} раз за {:.1f} мс: {}",
+                scope["method"],
+                scope["path"],
+                shape.count,
+                shape.duration * 1000,
+                statement[: self.config.statement_log_length],
+            )
+        if profile.queries > self.config.max_queries:
+            logger.warning(
+                "{} {} выполнил {} запросов к БД за {:.1f} мс",
+                scope["method"],
+                scope["path"],
+                profile.queries,
+                profile.db_time * 1000,
+            )
@@ -0,0 +1,68 @@
+from dataclasses import dataclass, field
+
+from core.pool_metrics import PoolMetrics
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    async_sessionmaker)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Методы, которые ничего не меняют и не требуют чтения с primary
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass
+class ReplicaEngine:
+    """Движок и пул соединений одной реплики"""
+
+    name: str
+    engine: AsyncEngine
+    pool_metrics: PoolMetrics
+    # time.monotonic(), до которого реплика считается недоступной
+    failed_until: float = 0.0
+    session_factory: async_sessionmaker[AsyncSession] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.session_factory = async_sessionmaker(
+            bind=self.engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+
+    def snapshot(self, now: float) -> dict:
+        """Состояние реплики для health-эндпоинта"""
+        return {
+            "name": self.name,
+            "available": self.failed_until <= now,
+            "pool": self.pool_metrics.snapshot(self.engine.sync_engine.pool),
+        }
+
+
+class PrimaryPinMiddleware:
+    """Закрепление клиента за primary после изменяющего запроса.
+
+    Успешный POST/PATCH/DELETE ставит короткоживущую куку, и пока она есть,
+    чтения этого клиента идут на primary: так он видит свои изменения,
+    даже если реплики еще не догнали.
+    """
+
+    def __init__(self, app: ASGIApp, cookie: str, max_age: int) -> None:
+        self.app = app
+        self.header = (
+            f"{cookie}=1; Max-Age={max_age}; Path=/; HttpOnly; SameSite=lax"
+        ).encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"set-cookie", self.header),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
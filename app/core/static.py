@@ -0,0 +1,86 @@
+import mimetypes
+from pathlib import PurePosixPath
+
+import anyio
+from core.assets import ENCODINGS, AssetManifest
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+# Файлы, имя которых однозначно определяет содержимое, кэшируются навсегда
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class CachedStaticFiles(StaticFiles):
+    """Раздача статики с долгим кэшированием неизменяемых файлов.
+
+    Если для файла собраны сжатые копии, отдается лучшая из тех, что
+    принимает клиент, без сжатия на лету.
+    """
+
+    def __init__(
+        self,
+        *args,
+        immutable_prefixes: tuple[str, ...] = (),
+        manifest: AssetManifest | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.immutable_prefixes = immutable_prefixes
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope):
+        encodings = self.manifest.available_encodings(path) if self.manifest else []
+        response = None
+        if encodings and scope["method"] in ("GET", "HEAD"):
+            response = await self.encoded_response(path, encodings, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if encodings:
+            # прокси должны хранить сжатые и несжатые версии раздельно
+            response.headers["Vary"] = "Accept-Encoding"
+        if response.status_code in (200, 304) and self.is_immutable(path):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    async def encoded_response(self, path: str, encodings: list[str], scope: Scope):
+        """Ответ со сжатой копией файла, если клиент принимает ее кодировку
+        Args:
+            path (str): путь к файлу внутри статики
+            encodings (list[str]): кодировки собранных копий в порядке приоритета
+            scope (Scope): ASGI scope запроса
+        Returns:
+            Response | None: ответ или None, если подходящей копии нет
+        """
+        request_headers = Headers(scope=scope)
+        accepted = {
+            value.split(";")[0].strip().lower()
+            for value in request_headers.get("accept-encoding", "").split(",")
+            # кодировка с q=0 явно запрещена клиентом
+            if value.replace(" ", "").split(";")[-1] not in ("q=0", "q=0.0")
+        }
+        for encoding in encodings:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(
+                self.lookup_path, f"{path}{ENCODINGS[encoding]}"
+            )
+            if stat_result is None:
+                continue
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                # тип содержимого берем по исходному файлу, а не по .br/.gz
+                media_type=mimetypes.guess_type(path)[0] or "text/plain",
+                headers={"Content-Encoding": encoding},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        return None
+
+    def is_immutable(self, path: str) -> bool:
+        path = PurePosixPath(path).as_posix()
+        return any(path.startswith(prefix) for prefix in self.immutable_prefixes)
@@ -0,0 +1,14 @@
+from core.assets import asset_manifest
+from core.config import settings
+from core.metrics import TimedTemplate
+from fastapi.templating import Jinja2Templates
+
+# Инициализация Jinja2Templates с указанием директории шаблонов
+landing = Jinja2Templates(directory=settings.files.landing_templates)
+admin = Jinja2Templates(directory=settings.files.admin_templates)
+
+# Ссылки на статику в шаблонах ведут на версии с хешем из манифеста сборки
+for templates in (landing, admin):
+    templates.env.globals["asset_url"] = asset_manifest.url
+    if settings.metrics.enabled or settings.profiler.enabled:
+        templates.env.template_class = TimedTemplate
@@ -0,0 +1,21 @@
+from crud.dao import BaseDAO
+from sections.models import Achievement, Product, Strategy
+
+
+class AchievementsDAO(BaseDAO):
+    model = Achievement
+
+
+class ProductsDAO(BaseDAO):
+    model = Product
+
+
+class StrategiesDAO(BaseDAO):
+    model = Strategy
+
+
+cards_dao_map = {
+    "achievements": AchievementsDAO,
+    "products": ProductsDAO,
+    "strategies": StrategiesDAO,
+}
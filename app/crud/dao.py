@@ -1,19 +1,31 @@
-from typing import Generic, List, TypeVar
+from typing import AsyncIterator, Generic, List, TypeVar
 
 from core.base import Base
+from core.logs import sampled_logger
 from loguru import logger
 from pydantic import BaseModel
+from sqlalchemy import Select, bindparam, column
 from sqlalchemy import delete as sqlalchemy_delete
-from sqlalchemy import func
+from sqlalchemy import func, insert, tuple_
 from sqlalchemy import update as sqlalchemy_update
+from sqlalchemy import values
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 T = TypeVar("T", bound=Base)
 
 
 class BaseDAO(Generic[T]):
+    # asyncpg не принимает больше 32767 параметров в одном запросе
+    max_bind_params = 32767
+    bulk_chunk_size = 1000
+    # поля, по которым возможна постраничная выборка по ключу
+    keyset_columns = ("id", "order_value")
+    # Запросы по модели и набору полей фильтра строятся один раз на процесс
+    _statements: dict[tuple, Select] = {}
 
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -22,83 +34,243 @@ class BaseDAO(Generic[T]):
 
     async def find_one_or_none_by_id(self, data_id: int):
         try:
-            query = select(self.model).filter_by(id=data_id)
-            result = await self._session.execute(query)
+            query, params = self._filtered("select", {"id": data_id})
+            result = await self._session.execute(query, params)
             record = result.scalar_one_or_none()
-            log_message = f"Запись {self.model.__name__} с ID {data_id} {'найдена' if record else 'не найдена'}."
-            logger.info(log_message)
+            sampled_logger.info(
+                "Запись {} с ID {} {}.",
+                self.model.__name__,
+                data_id,
+                "найдена" if record else "не найдена",
+            )
             return record
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при поиске записи с ID {data_id}: {e}")
+            logger.error("Ошибка при поиске записи с ID {}: {}", data_id, e)
             raise
 
     async def find_one_or_none(self, filters: BaseModel):
         filter_dict = filters.model_dump(exclude_unset=True)
-        logger.info(
-            f"Поиск одной записи {self.model.__name__} по фильтрам: {filter_dict}"
+        sampled_logger.info(
+            "Поиск одной записи {} по фильтрам: {}", self.model.__name__, filter_dict
         )
         try:
-            query = select(self.model).filter_by(**filter_dict)
-            result = await self._session.execute(query)
+            query, params = self._filtered("select", filter_dict)
+            result = await self._session.execute(query, params)
             record = result.scalar_one_or_none()
-            log_message = f"Запись {'найдена' if record else 'не найдена'} по фильтрам: {filter_dict}"
-            logger.info(log_message)
+            sampled_logger.info(
+                "Запись {} по фильтрам: {}",
+                "найдена" if record else "не найдена",
+                filter_dict,
+            )
             return record
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при поиске записи по фильтрам {filter_dict}: {e}")
+            logger.error("Ошибка при поиске записи по фильтрам {}: {}", filter_dict, e)
             raise
 
-    async def find_all(self, filters: BaseModel | None = None):
+    async def find_all(
+        self,
+        filters: BaseModel | None = None,
+        order_by: str | None = None,
+        after: tuple | None = None,
+        limit: int | None = None,
+    ):
+        """Поиск записей, при необходимости постранично по ключу.
+
+        Следующая страница запрашивается с after=self.keyset(последняя запись),
+        поэтому выборка не замедляется с ростом номера страницы, как OFFSET.
+
+        Args:
+            filters (BaseModel | None): фильтры по равенству полей
+            order_by (str | None): поле сортировки из keyset_columns
+            after (tuple | None): ключ последней записи предыдущей страницы
+            limit (int | None): размер страницы
+        Returns:
+            list: найденные записи
+        """
         filter_dict = filters.model_dump(exclude_unset=True) if filters else {}
-        logger.info(
-            f"Поиск всех записей {self.model.__name__} по фильтрам: {filter_dict}"
+        sampled_logger.info(
+            "Поиск всех записей {} по фильтрам: {}", self.model.__name__, filter_dict
         )
         try:
-            query = select(self.model).filter_by(**filter_dict)
-            result = await self._session.execute(query)
+            query, params = self._keyset_query(filter_dict, order_by, after)
+            result = await self._session.execute(query.limit(limit), params)
             records = result.scalars().all()
-            logger.info(f"Найдено {len(records)} записей.")
+            sampled_logger.info("Найдено {} записей.", len(records))
             return records
         except SQLAlchemyError as e:
             logger.error(
-                f"Ошибка при поиске всех записей по фильтрам {filter_dict}: {e}"
+                "Ошибка при поиске всех записей по фильтрам {}: {}", filter_dict, e
             )
             raise
 
+    async def iter_all(
+        self,
+        filters: BaseModel | None = None,
+        order_by: str = "id",
+        batch_size: int = 500,
+    ) -> AsyncIterator[T]:
+        """Потоковое чтение записей через серверный курсор.
+
+        В памяти одновременно находится не больше batch_size строк, поэтому
+        подходит для выгрузки таблиц любого размера.
+
+        Args:
+            filters (BaseModel | None): фильтры по равенству полей
+            order_by (str): поле сортировки из keyset_columns
+            batch_size (int): сколько строк забирать с сервера за раз
+        Returns:
+            AsyncIterator[T]: записи по одной
+        """
+        filter_dict = filters.model_dump(exclude_unset=True) if filters else {}
+        query, params = self._keyset_query(filter_dict, order_by)
+        result = await self._session.stream_scalars(
+            query.execution_options(yield_per=batch_size), params
+        )
+        async for record in result:
+            yield record
+
+    def keyset(self, record: T, order_by: str | None = None) -> tuple:
+        """Ключ записи для параметра after следующей страницы"""
+        return tuple(getattr(record, name) for name in self._keyset_names(order_by))
+
+    def _keyset_names(self, order_by: str | None) -> tuple[str, ...]:
+        if order_by is None or order_by == "id":
+            return ("id",)
+        if order_by not in self.keyset_columns or not hasattr(self.model, order_by):
+            raise ValueError(
+                f"Сортировка {self.model.__name__} по {order_by} невозможна"
+            )
+        # id делает ключ уникальным при одинаковых значениях поля
+        return (order_by, "id")
+
+    def _keyset_query(
+        self, filter_dict: dict, order_by: str | None, after: tuple | None = None
+    ) -> tuple[Select, dict]:
+        query, params = self._filtered("select", filter_dict)
+        if order_by is None and after is None:
+            return query, params
+        columns = [getattr(self.model, name) for name in self._keyset_names(order_by)]
+        if after is not None:
+            query = query.where(tuple_(*columns) > tuple_(*after))
+        return query.order_by(*columns), params
+
+    def _filtered(self, kind: str, filter_dict: dict) -> tuple[Select, dict]:
+        """Готовый запрос с параметрами вместо значений фильтра.
+
+        Один объект запроса на модель и набор полей избавляет от построения
+        выражения и расчета ключа кэша компиляции SQLAlchemy при каждом вызове.
+
+        Args:
+            kind (str): select - записи, count - их количество
+            filter_dict (dict): фильтры по равенству полей
+        Returns:
+            tuple[Select, dict]: запрос и значения его параметров
+        """
+        # None сравнивается через IS NULL, поэтому входит в форму запроса
+        shape = tuple(
+            sorted((key, value is None) for key, value in filter_dict.items())
+        )
+        cache_key = (self.model, kind, shape)
+        query = self._statements.get(cache_key)
+        if query is None:
+            query = (
+                select(func.count(self.model.id))
+                if kind == "count"
+                else select(self.model)
+            ).where(
+                *[
+                    (
+                        getattr(self.model, key).is_(None)
+                        if is_null
+                        else getattr(self.model, key) == bindparam(f"filter_{key}")
+                    )
+                    for key, is_null in shape
+                ]
+            )
+            self._statements[cache_key] = query
+        params = {
+            f"filter_{key}": value
+            for key, value in filter_dict.items()
+            if value is not None
+        }
+        return query, params
+
     async def add(self, values: BaseModel):
         values_dict = values.model_dump(exclude_unset=True)
         logger.info(
-            f"Добавление записи {self.model.__name__} с параметрами: {values_dict}"
+            "Добавление записи {} с параметрами: {}", self.model.__name__, values_dict
         )
         try:
             new_instance = self.model(**values_dict)
             self._session.add(new_instance)
-            logger.info(f"Запись {self.model.__name__} успешно добавлена.")
+            logger.info("Запись {} успешно добавлена.", self.model.__name__)
             return new_instance
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при добавлении записи: {e}")
+            logger.error("Ошибка при добавлении записи: {}", e)
             raise
 
-    async def add_many(self, instances: List[BaseModel]):
+    async def add_many(
+        self,
+        instances: List[BaseModel],
+        return_rows: bool = False,
+        chunk_size: int | None = None,
+    ) -> list:
+        """Массовая вставка записей через INSERT ... RETURNING.
+
+        Записи с одинаковым набором полей вставляются одним многострочным
+        INSERT на пачку, без unit of work и flush каждого объекта.
+
+        Args:
+            instances (List[BaseModel]): данные новых записей
+            return_rows (bool): вернуть легкие строки вместо ORM-объектов
+            chunk_size (int | None): максимум записей в одном запросе
+        Returns:
+            list: созданные объекты (или строки) в порядке входных данных
+        """
         values_list = [item.model_dump(exclude_unset=True) for item in instances]
         logger.info(
-            f"Добавление нескольких записей {self.model.__name__}. Количество: {len(values_list)}"
+            "Добавление нескольких записей {}. Количество: {}",
+            self.model.__name__,
+            len(values_list),
         )
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for index, values_dict in enumerate(values_list):
+            groups.setdefault(tuple(sorted(values_dict)), []).append(index)
+        returning = self.model.__table__.c if return_rows else (self.model,)
         try:
-            new_instances = [self.model(**values) for values in values_list]
-            self._session.add_all(new_instances)
-            logger.info(f"Успешно добавлено {len(new_instances)} записей.")
-            await self._session.flush()
-            return new_instances
+            created = [None] * len(values_list)
+            for keys, indexes in groups.items():
+                size = min(
+                    chunk_size or self.bulk_chunk_size,
+                    self.max_bind_params // max(len(keys), 1),
+                )
+                for start in range(0, len(indexes), size):
+                    chunk = indexes[start : start + size]
+                    query = (
+                        insert(self.model)
+                        .returning(*returning, sort_by_parameter_order=True)
+                        .execution_options(insertmanyvalues_page_size=size)
+                    )
+                    result = await self._session.execute(
+                        query, [values_list[index] for index in chunk]
+                    )
+                    rows = result.all() if return_rows else result.scalars().all()
+                    for index, row in zip(chunk, rows):
+                        created[index] = row
+            logger.info("Успешно добавлено {} записей.", len(created))
+            return created
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при добавлении нескольких записей: {e}")
+            logger.error("Ошибка при добавлении нескольких записей: {}", e)
             raise
 
     async def update(self, filters: BaseModel, values: BaseModel):
         filter_dict = filters.model_dump(exclude_unset=True)
         values_dict = values.model_dump(exclude_unset=True)
         logger.info(
-            f"Обновление записей {self.model.__name__} по фильтру: {filter_dict} с параметрами: {values_dict}"
+            "Обновление записей {} по фильтру: {} с параметрами: {}",
+            self.model.__name__,
+            filter_dict,
+            values_dict,
         )
         try:
             query = (
@@ -108,63 +280,113 @@ class BaseDAO(Generic[T]):
                 .execution_options(synchronize_session="fetch")
             )
             result = await self._session.execute(query)
-            logger.info(f"Обновлено {result.rowcount} записей.")
+            logger.info("Обновлено {} записей.", result.rowcount)
             await self._session.flush()
             return result.rowcount
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при обновлении записей: {e}")
+            logger.error("Ошибка при обновлении записей: {}", e)
             raise
 
     async def delete(self, filters: BaseModel):
         filter_dict = filters.model_dump(exclude_unset=True)
-        logger.info(f"Удаление записей {self.model.__name__} по фильтру: {filter_dict}")
+        logger.info(
+            "Удаление записей {} по фильтру: {}", self.model.__name__, filter_dict
+        )
         if not filter_dict:
             logger.error("Нужен хотя бы один фильтр для удаления.")
             raise ValueError("Нужен хотя бы один фильтр для удаления.")
         try:
             query = sqlalchemy_delete(self.model).filter_by(**filter_dict)
             result = await self._session.execute(query)
-            logger.info(f"Удалено {result.rowcount} записей.")
+            logger.info("Удалено {} записей.", result.rowcount)
             await self._session.flush()
             return result.rowcount
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при удалении записей: {e}")
+            logger.error("Ошибка при удалении записей: {}", e)
             raise
 
     async def count(self, filters: BaseModel | None = None):
         filter_dict = filters.model_dump(exclude_unset=True) if filters else {}
-        logger.info(
-            f"Подсчет количества записей {self.model.__name__} по фильтру: {filter_dict}"
+        sampled_logger.info(
+            "Подсчет количества записей {} по фильтру: {}",
+            self.model.__name__,
+            filter_dict,
         )
         try:
-            query = select(func.count(self.model.id)).filter_by(**filter_dict)
-            result = await self._session.execute(query)
+            query, params = self._filtered("count", filter_dict)
+            result = await self._session.execute(query, params)
             count = result.scalar()
-            logger.info(f"Найдено {count} записей.")
+            sampled_logger.info("Найдено {} записей.", count)
             return count
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при подсчете записей: {e}")
+            logger.error("Ошибка при подсчете записей: {}", e)
             raise
 
-    async def bulk_update(self, records: List[BaseModel]):
-        logger.info(f"Массовое обновление записей {self.model.__name__}")
+    async def bulk_update(
+        self, records: List[BaseModel], chunk_size: int | None = None
+    ) -> int:
+        """Массовое обновление записей по id одним запросом на пачку.
+
+        Записи группируются по набору обновляемых полей, каждая группа уходит
+        как UPDATE ... FROM (VALUES ...) пачками, чтобы не упереться в лимит
+        параметров запроса.
+
+        Args:
+            records (List[BaseModel]): записи с id и обновляемыми полями
+            chunk_size (int | None): максимум записей в одном запросе
+        Returns:
+            int: количество обновленных записей
+        """
+        logger.info(
+            "Массовое обновление записей {}. Количество: {}",
+            self.model.__name__,
+            len(records),
+        )
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for record in records:
+            record_dict = record.model_dump(exclude_unset=True)
+            if "id" not in record_dict or len(record_dict) == 1:
+                continue
+            keys = tuple(sorted(key for key in record_dict if key != "id"))
+            groups.setdefault(keys, []).append(record_dict)
         try:
             updated_count = 0
-            for record in records:
-                record_dict = record.model_dump(exclude_unset=True)
-                if "id" not in record_dict:
-                    continue
-                update_data = {k: v for k, v in record_dict.items() if k != "id"}
-                stmt = (
-                    sqlalchemy_update(self.model)
-                    .filter_by(id=record_dict["id"])
-                    .values(**update_data)
+            for keys, rows in groups.items():
+                size = min(
+                    chunk_size or self.bulk_chunk_size,
+                    self.max_bind_params // (len(keys) + 1),
                 )
-                result = await self._session.execute(stmt)
-                updated_count += result.rowcount
-            logger.info(f"Обновлено {updated_count} записей")
+                for start in range(0, len(rows), size):
+                    updated_count += await self._update_from_values(
+                        keys=keys, rows=rows[start : start + size]
+                    )
+            logger.info("Обновлено {} записей", updated_count)
             await self._session.flush()
             return updated_count
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при массовом обновлении: {e}")
+            logger.error("Ошибка при массовом обновлении: {}", e)
             raise
+
+    async def _update_from_values(self, keys: tuple[str, ...], rows: list[dict]) -> int:
+        columns = self.model.__table__.c
+        rows_table = values(
+            column("id", columns["id"].type),
+            *[column(key, columns[key].type) for key in keys],
+            name="rows",
+        ).data([(row["id"], *[row[key] for key in keys]) for row in rows])
+        query = (
+            sqlalchemy_update(self.model)
+            .where(self.model.id == rows_table.c.id)
+            .values({key: rows_table.c[key] for key in keys})
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(query)
+        # значения известны заранее, поэтому загруженные объекты обновляем сами
+        for row in rows:
+            instance = self._session.identity_map.get(
+                identity_key(self.model, row["id"])
+            )
+            if instance is not None:
+                for key in keys:
+                    set_committed_value(instance, key, row[key])
+        return result.rowcount
@@ -0,0 +1,169 @@
+import asyncio
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core.config import settings
+from fastapi import HTTPException, status
+from loguru import logger
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError, features
+except ImportError:  # без Pillow картинки отдаются только в исходном виде
+    Image = None
+
+# Форматы, которые можно ужать в варианты (svg масштабируется и так)
+RESIZABLE_FORMATS = {"image/jpeg", "image/png", "image/webp"}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+class BrokenImageError(ValueError):
+    """Загруженный файл не декодируется как картинка"""
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Пул процессов для кодирования картинок вне event loop"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.files.image_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Остановка пула процессов при завершении приложения"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def available_formats() -> list[str]:
+    """Форматы из настроек, которые поддерживает установленный Pillow"""
+    if Image is None:
+        return []
+    return [
+        image_format
+        for image_format in settings.files.image_variant_formats
+        if features.check(image_format)
+    ]
+
+
+def variant_paths(file_location: Path) -> list[Path]:
+    """Файлы вариантов, сгенерированные для картинки"""
+    return list(file_location.parent.glob(f"{file_location.stem}_*w.*"))
+
+
+def save_atomic(image, path: Path, image_format: str, quality: int) -> None:
+    """Запись варианта через временный файл: по URL варианта, который отдается
+    как immutable, не должен оказаться недописанный файл
+    """
+    temp_path = path.with_name(f".{uuid.uuid4()}.part")
+    try:
+        image.save(temp_path, format=image_format.upper(), quality=quality)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def generate_variants(
+    source: str, widths: list[int], formats: list[str], quality: int
+) -> dict:
+    """Нарезка картинки по ширинам и форматам (выполняется в пуле процессов)
+    Args:
+        source (str): путь к исходному файлу
+        widths (list[int]): целевые ширины
+        formats (list[str]): целевые форматы (webp, avif)
+        quality (int): качество сжатия
+    Returns:
+        dict: {формат: [{"width": ..., "path": ...}]} по возрастанию ширины
+    """
+    source_path = Path(source)
+    variants = {image_format: [] for image_format in formats}
+    try:
+        original = Image.open(source_path)
+        original.load()
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise BrokenImageError(str(e)) from None
+    with original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        # варианты уже исходника не делаем, но сам исходник перекодируем
+        target_widths = sorted({w for w in widths if w < image.width} | {image.width})
+        for width in target_widths:
+            height = round(image.height * width / image.width)
+            resized = (
+                image
+                if width == image.width
+                else image.resize((width, height), Image.Resampling.LANCZOS)
+            )
+            for image_format in formats:
+                path = source_path.with_name(
+                    f"{source_path.stem}_{width}w.{image_format}"
+                )
+                # у одинаковых исходников одинаковые варианты - не пересчитываем
+                if path.exists():
+                    # свежая дата изменения защищает файл от сборщика сирот
+                    os.utime(path)
+                else:
+                    save_atomic(resized, path, image_format, quality)
+                variants[image_format].append({"width": width, "path": str(path)})
+    return variants
+
+
+async def build_variants(image_url: str, content_type: str) -> dict | None:
+    """Генерация адаптивных вариантов загруженной картинки
+    Args:
+        image_url (str): URL сохраненного исходника
+        content_type (str): MIME-тип исходника
+    Returns:
+        dict | None: {формат: [{"width": ..., "url": ...}]} или None
+    Raises:
+        HTTPException: 400, если Pillow не смог декодировать исходник
+    """
+    if Image is None or content_type not in RESIZABLE_FORMATS:
+        return None
+    # без форматов вариантов исходник все равно проверяем на декодируемость
+    formats = available_formats()
+    source = Path(settings.files.base_dir, image_url.lstrip("/"))
+    loop = asyncio.get_running_loop()
+    try:
+        variants = await loop.run_in_executor(
+            get_executor(),
+            generate_variants,
+            str(source),
+            settings.files.image_variant_widths,
+            formats,
+            settings.files.image_variant_quality,
+        )
+    except BrokenImageError as e:
+        logger.warning("Загружен файл, не являющийся картинкой {}: {}", image_url, e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Файл не является изображением или поврежден.",
+        )
+    except Exception as e:
+        # исходник уже сохранен, страница просто обойдется без вариантов
+        # готовые варианты не удаляем: по хешу содержимого они могут быть общими
+        # с другими карточками, недописанных файлов после save_atomic не остается
+        logger.error("Ошибка при генерации вариантов {}: {}", image_url, e)
+        return None
+    if not formats:
+        return None
+    base_dir = Path(settings.files.base_dir)
+    return {
+        image_format: [
+            {
+                "width": item["width"],
+                "url": f"/{Path(item['path']).relative_to(base_dir).as_posix()}",
+            }
+            for item in items
+        ]
+        for image_format, items in variants.items()
+    }
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import uuid
+from pathlib import Path
+
+import aiofiles
+from core.config import settings
+from core.db_helper import db_helper
+from core.invalidation import invalidation_bus
+from core.templates import landing
+from crud.sections import get_all
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class LandingPublisher:
+    """Публикация лендинга в статический HTML-файл.
+
+    Файл сначала пишется во временный рядом с целевым, затем подменяется
+    атомарным переименованием, поэтому статика никогда не отдает
+    недописанную страницу.
+    """
+
+    def __init__(self, target: str, delay: float = 1.0) -> None:
+        self.target = Path(target)
+        self.delay = delay
+        self._task: asyncio.Task | None = None
+        self._dirty = False
+
+    async def publish(self, session: AsyncSession) -> Path:
+        """Рендеринг лендинга и запись на диск
+        Args:
+            session (AsyncSession): текущая сессия
+        Returns:
+            Path: путь к опубликованному файлу
+        """
+        html = landing.get_template("index.html").render(
+            await get_all(request=None, session=session)
+        )
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.target.with_name(f".{self.target.name}.{uuid.uuid4().hex}")
+        try:
+            async with aiofiles.open(temp_path, "w", encoding="utf-8") as buffer:
+                await buffer.write(html)
+            os.replace(temp_path, self.target)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        logger.info(f"Лендинг опубликован в {self.target}")
+        return self.target
+
+    def schedule(self) -> None:
+        """Отложенная публикация после изменения контента.
+
+        Серия правок подряд приводит к одной публикации после паузы.
+        """
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            self._dirty = False
+            try:
+                async with db_helper.session_factory() as session:
+                    await self.publish(session=session)
+            except Exception as e:
+                logger.error(f"Ошибка при публикации лендинга: {e}")
+
+
+landing_publisher = LandingPublisher(
+    target=settings.files.published_landing,
+    delay=settings.files.publish_delay,
+)
+if settings.files.publish_on_change:
+    # каждый воркер обновляет свою копию при изменении контента на любом из них
+    invalidation_bus.subscribe(landing_publisher.schedule)
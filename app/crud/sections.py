@@ -1,15 +1,25 @@
+import asyncio
+import hashlib
 import os
 import uuid
+from pathlib import Path
+from typing import Iterator
 
+import aiofiles
+import aiofiles.os
 from core.config import settings
+from core.invalidation import invalidation_bus
+from crud.cards import cards_dao_map
+from crud.images import build_variants, variant_paths
 from fastapi import HTTPException, Request, UploadFile, status
 from loguru import logger
 from sections.models import Section, models_map
-from sections.schemas import (CardCreate, EntityDelete, EntityUpdate,
-                              ImageUpdate)
-from sqlalchemy import delete, func, select, update
+from sections.schemas import (CardCreate, CardOrder, CardsReorder,
+                              EntityDelete, EntityUpdate, ImageUpdate)
+from sqlalchemy import (Text, cast, delete, func, literal, or_, select,
+                        union_all, update)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import contains_eager
+from sqlalchemy.orm import selectinload
 
 # Сопоставление названий секций с их идентификаторами
 sections_map = {
@@ -19,6 +29,18 @@ sections_map = {
 }
 
 
+# Шаг порядковых значений: перенос между соседями меняет одну строку
+ORDER_GAP = 1024
+
+# Расширения файлов картинок по их MIME-типу
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/svg+xml": "svg",
+    "image/webp": "webp",
+}
+
+
 # Получение данных всех секций
 async def get_all(request: Request, session: AsyncSession) -> dict:
     """Чтение всех секций
@@ -28,57 +50,79 @@ async def get_all(request: Request, session: AsyncSession) -> dict:
     Returns:
         dict: Словарь, содержащий данные всех секций.
     """
-    # Создание списка словарей, где каждый словарь содержит имя секции и её идентификатор
-    sections_list = [
-        {"name": section_name, "id": section_id}
-        for section_name, section_id in sections_map.items()
-    ]
     # Инициализация словаря, который будет содержать данные секций
     sections = {
         "request": request,
     }
-    for entity in sections_list:
-        # читаем конкретную секцию
-        section = await read_section(
-            section_id=entity["id"],
-            entity_name=entity["name"],
-            session=session,
-        )
-        sections.update({entity["name"]: section})
-        logger.info(f"Получены данные секции {entity}: {section}")
+    # читаем все секции вместе с карточками разом
+    sections_data = await load_sections(session=session)
+    for section_name, section in sections_data.items():
+        sections.update({section_name: section})
+        logger.debug("Получены данные секции {}: {}", section_name, section)
     return sections
 
 
-# Чтение данных конкретной секции
-async def read_section(section_id: int, entity_name: str, session: AsyncSession):
-    """Чтение данных  таблицы связанной с текущей секцией
+# Чтение данных всех секций за фиксированное число запросов
+async def load_sections(session: AsyncSession) -> dict:
+    """Пакетное чтение секций и связанных с ними карточек
     Args:
-        section_id (int): DI секции
-        entity_name (str): название связанной таблицы
         session (AsyncSession): текущая сессия
     Returns:
-        object: все записи найденой таблицы
+        dict: секции по их названиям, карточки отсортированы по order_value
     """
-    logger.info(f"ID запрашиваемой секции: {section_id}")
-    # Получение модели данных, соответствующей имени секции
-    model = models_map[entity_name]
-    # Получение атрибута модели Section, соответствующего имени секции
-    relation_entity = getattr(Section, entity_name)
+    # один запрос на секции и по одному IN-запросу на каждый тип карточек,
+    # независимо от количества секций и карточек
     query = (
-        select(Section)  # Выборка из таблицы Section
-        .add_columns(Section.id)  # Добавление столбца с идентификатором секции
-        .outerjoin(
-            model, Section.id == model.section_id
-        )  # Внешнее соединение с соответствующей моделью
-        .options(contains_eager(relation_entity))  # Загрузка связанных данных
-        .where(Section.id == section_id)  # Фильтрация по идентификатору секции
-        .order_by(
-            Section.id, model.order_value
-        )  # Сортировка по идентификатору секции и порядковому значению
+        select(Section)
+        .where(Section.id.in_(sections_map.values()))
+        .options(
+            *[
+                # обратная связь на секцию уже в identity map, JOIN не нужен
+                selectinload(getattr(Section, section_name)).lazyload(
+                    models_map[section_name].sections
+                )
+                for section_name in sections_map
+            ]
+        )
     )
     result = await session.execute(query)
-    relation_data = result.scalars().first()
-    return relation_data
+    sections_by_id = {section.id: section for section in result.scalars().all()}
+    return {
+        section_name: sections_by_id.get(section_id)
+        for section_name, section_id in sections_map.items()
+    }
+
+
+# Срез состояния контента для условных запросов
+async def get_content_state(session: AsyncSession) -> list:
+    """Количество записей и время последнего изменения по каждой таблице
+    Args:
+        session (AsyncSession): текущая сессия
+    Returns:
+        list: строки (таблица, количество, max(updated_at)), один запрос к БД
+    """
+    query = union_all(
+        *[
+            select(
+                literal(table_name), func.count(model.id), func.max(model.updated_at)
+            )
+            for table_name, model in models_map.items()
+        ]
+    )
+    result = await session.execute(query)
+    return [tuple(row) for row in result.all()]
+
+
+# Фиксация изменений контента
+async def commit_content(session: AsyncSession) -> None:
+    """Коммит изменений контента со сбросом кэшей на всех воркерах
+    Args:
+        session (AsyncSession): текущая сессия
+    """
+    # оповещение уйдет другим воркерам только если коммит пройдет
+    await invalidation_bus.publish(session=session)
+    await session.commit()
+    invalidation_bus.evict_local()
 
 
 async def create_card(table_name: str, payload: CardCreate, session: AsyncSession):
@@ -92,13 +136,17 @@ async def create_card(table_name: str, payload: CardCreate, session: AsyncSessio
     """
     model = models_map[table_name]
     new_card = model(**payload.model_dump())
-    # получим текущее максимальное значение order_value
-    max_value = await get_order_value(model=model, session=session)
+    # параллельные создания в одной секции не получат одинаковый order_value
+    await lock_section(section_id=payload.section_id, session=session)
+    # получим текущее максимальное значение order_value в секции
+    max_value = await get_order_value(
+        model=model, section_id=payload.section_id, session=session
+    )
     # обновим у нового экземпляра order_value
-    new_card.order_value = max_value + 1
+    new_card.order_value = max_value + ORDER_GAP
     # добавим новую запись
     session.add(new_card)
-    await session.commit()
+    await commit_content(session=session)
     await session.refresh(new_card)
     return new_card
 
@@ -120,33 +168,175 @@ async def delete_card(table_name: str, payload: EntityDelete, session: AsyncSess
         )
         result = await session.execute(query)
         images_list = result.one_or_none()
-        # пробежимся по картинкам и удалим каждую с диска
-        for image in images_list:
-            logger.info(f"Файл {image} передается на удаление...")
-            await delete_image(image)
-        # после удаления картинок удалим саму запись
+        if images_list is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Карточка: {payload.id} не найден...",
+            )
+        # удалим саму запись
         query = delete(model).where(model.id == payload.id)
         await session.execute(query)
-        await session.commit()
+        await commit_content(session=session)
+    except HTTPException:
+        await session.rollback()
+        raise
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # после коммита удалим с диска картинки, на которые больше никто не ссылается
+    for image in images_list:
+        logger.info("Файл {} передается на удаление...", image)
+        await release_image(image_url=image, session=session)
     return {"message": "Экземпляр был успешно удален!"}
 
 
-async def get_order_value(model, session: AsyncSession) -> int:
-    """Получение последнего порядкового номера среди записей
+async def get_order_value(model, section_id: int, session: AsyncSession) -> int:
+    """Получение последнего порядкового номера среди записей секции
     Args:
         model (model): таблица
+        section_id (int): ID секции
         session (_type_): текущая сессия
     Returns:
         int: текущее значение или 0
     """
-    max_value = await session.execute(func.max(model.order_value))
+    # по индексу (section_id, order_value) без просмотра всей таблицы
+    max_value = await session.execute(
+        select(func.max(model.order_value)).where(model.section_id == section_id)
+    )
     order_value = max_value.scalar()
     return order_value if order_value is not None else 0
 
 
+async def lock_section(section_id: int, session: AsyncSession) -> None:
+    """Блокировка строки секции до конца транзакции.
+
+    Сериализует распределение order_value внутри секции, не мешая
+    изменениям в других секциях.
+
+    Args:
+        section_id (int): ID секции
+        session (AsyncSession): текущая сессия
+    """
+    query = select(Section.id).where(Section.id == section_id).with_for_update()
+    if (await session.execute(query)).scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Секция: {section_id} не найдена...",
+        )
+
+
+async def reorder_cards(table_name: str, payload: CardsReorder, session: AsyncSession):
+    """Перенос карточек внутри секции
+    Args:
+        table_name (str): название таблицы карточек
+        payload (CardsReorder): переносы в порядке применения
+        session (AsyncSession): текущая сессия
+    Returns:
+        list[CardOrder]: новые порядковые значения перенесенных карточек
+    """
+    if table_name not in cards_dao_map:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Таблица карточек: {table_name} не найдена...",
+        )
+    model = models_map[table_name]
+    moved_ids = []
+    try:
+        for move in payload.moves:
+            card = await session.get(model, move.id)
+            if not card:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Карточка: {move.id} не найдена...",
+                )
+            await lock_section(section_id=card.section_id, session=session)
+            card.order_value = await place_after(
+                table_name=table_name,
+                card=card,
+                after_id=move.after_id,
+                session=session,
+            )
+            # autoflush выключен: следующий перенос читает соседей из БД
+            await session.flush()
+            if card.id not in moved_ids:
+                moved_ids.append(card.id)
+        # перенумерация секции могла сдвинуть и ранее перенесенные карточки
+        result = await session.execute(
+            select(model.id, model.order_value).where(model.id.in_(moved_ids))
+        )
+        order_values = dict(result.all())
+        await commit_content(session=session)
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info("Перенесено карточек {}: {}", table_name, len(moved_ids))
+    return [CardOrder(id=id, order_value=order_values[id]) for id in moved_ids]
+
+
+async def place_after(
+    table_name: str, card, after_id: int | None, session: AsyncSession
+) -> int:
+    """Порядковое значение для карточки, вставленной после соседа.
+
+    Обычно значение берется посередине промежутка между соседями, и перенос
+    меняет одну строку. Если промежутка не осталось, секция перенумеровывается
+    с шагом ORDER_GAP одним запросом.
+
+    Args:
+        table_name (str): название таблицы карточек
+        card (model): перемещаемая карточка
+        after_id (int | None): ID карточки слева или None для начала секции
+        session (AsyncSession): текущая сессия (секция уже заблокирована)
+    Returns:
+        int: новое значение order_value карточки
+    """
+    model = models_map[table_name]
+    low = None
+    if after_id is not None:
+        after = await session.get(model, after_id)
+        if not after or after.section_id != card.section_id or after.id == card.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Карточка: {after_id} не может быть соседом {card.id}",
+            )
+        low = after.order_value
+    query = (
+        select(func.min(model.order_value))
+        .where(model.section_id == card.section_id)
+        .where(model.id != card.id)
+    )
+    if low is not None:
+        query = query.where(model.order_value > low)
+    high = (await session.execute(query)).scalar()
+    if high is None:
+        return (low or 0) + ORDER_GAP
+    if low is None:
+        return high - ORDER_GAP
+    if high - low > 1:
+        return (low + high) // 2
+    # промежуток исчерпан: раздвигаем всю секцию по значениям из БД,
+    # поэтому незаписанных изменений порядка в сессии быть не должно
+    await session.flush()
+    query = (
+        select(model.id)
+        .where(model.section_id == card.section_id)
+        .where(model.id != card.id)
+        .order_by(model.order_value, model.id)
+    )
+    ids = list((await session.execute(query)).scalars())
+    ids.insert(ids.index(after_id) + 1, card.id)
+    await cards_dao_map[table_name](session).bulk_update(
+        [
+            CardOrder(id=id, order_value=(index + 1) * ORDER_GAP)
+            for index, id in enumerate(ids)
+        ]
+    )
+    return (ids.index(card.id) + 1) * ORDER_GAP
+
+
 async def update_content(id: int, payload: EntityUpdate, session: AsyncSession):
     """Обновляем запись
     Args:
@@ -157,7 +347,7 @@ async def update_content(id: int, payload: EntityUpdate, session: AsyncSession):
         instance: обновленная запись
     """
     model = models_map[payload.table_name]
-    logger.info(f"Обовляем данные модели: {model}")
+    logger.info("Обовляем данные модели: {}", model)
     # Получаем объект из базы
     card = await session.get(model, id)
     if not card:
@@ -173,9 +363,9 @@ async def update_content(id: int, payload: EntityUpdate, session: AsyncSession):
         # производим запись данных
         setattr(card, key, value)
     try:
-        await session.commit()
+        await commit_content(session=session)
         await session.refresh(card)
-        logger.info(f"Данные успешно обновлены: {card}")
+        logger.info("Данные успешно обновлены: {}", card)
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -199,30 +389,82 @@ async def add_img(
     Returns:
         success: {"message": ...}
     """
-    image_url = await save_image(
-        image=image,
-        image_type=image_type,
-        table_name=table_name,
-    )
+    image_url = await save_image(image=image, image_type=image_type)
     try:
+        # нарезка адаптивных вариантов в пуле процессов, она же проверяет,
+        # что под заявленным MIME-типом действительно картинка
+        variants = await build_variants(
+            image_url=image_url, content_type=image.content_type
+        )
         model = models_map[table_name]
-        query = update(model).where(model.id == id).values({f"{image_type}": image_url})
-        field = await session.execute(query)
-        logger.info(f"Обновление поля {image_type} успешно!")
-        await session.commit()
+        # не даем сборщику сирот убрать исходник и варианты до нашего коммита
+        for url in card_image_urls(image_url, None, {image_type: variants or {}}):
+            await lock_image(image_url=url, session=session)
+            if not await aiofiles.os.path.exists(image_file_path(url)):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Изображение было удалено параллельно, повторите загрузку.",
+                )
+        query = select(getattr(model, image_type), model.image_variants).where(
+            model.id == id
+        )
+        card = (await session.execute(query)).one_or_none()
+        if card is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Карточка: {id} не найден...",
+            )
+        previous_url, current_variants = card
+        values = {
+            f"{image_type}": image_url,
+            "image_variants": merge_variants(
+                current=current_variants, image_type=image_type, variants=variants
+            ),
+        }
+        query = update(model).where(model.id == id).values(values)
+        await session.execute(query)
+        logger.info("Обновление поля {} успешно!", image_type)
+        await commit_content(session=session)
     except Exception as e:
-        logger.error(f"Ошибка при обновлении {table_name}-{image_type}: {e}")
+        logger.error("Ошибка при обновлении {}-{}: {}", table_name, image_type, e)
         await session.rollback()
+        try:
+            # не оставляем на диске файл, который так и не попал в БД
+            await release_image(image_url=image_url, session=session)
+        except Exception as release_error:
+            # файл подберет сборщик сирот, исходную ошибку не теряем
+            logger.error("Не удалось освободить {}: {}", image_url, release_error)
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    return {"message": "Изображение успешно сохранено", image_type: field}
+    # замененная картинка могла остаться без ссылок
+    if previous_url != image_url:
+        await release_image(image_url=previous_url, session=session)
+    return {"message": "Изображение успешно сохранено", image_type: image_url}
 
 
-async def save_image(image: UploadFile, image_type: str, table_name: str) -> str:
-    """Сохраняем картинку
+def merge_variants(
+    current: dict | None, image_type: str, variants: dict | None
+) -> dict:
+    """Замена вариантов одного типа картинки в значении поля image_variants
+    Args:
+        current (dict | None): текущее значение поля
+        image_type (str): тип картинки (image_desktop, image_mobile)
+        variants (dict | None): новые варианты или None, чтобы их убрать
+    Returns:
+        dict: итоговое значение поля image_variants
+    """
+    merged = {key: value for key, value in (current or {}).items() if key != image_type}
+    if variants:
+        merged[image_type] = variants
+    return merged
+
+
+async def save_image(image: UploadFile, image_type: str) -> str:
+    """Сохраняем картинку под именем по хешу ее содержимого
     Args:
         image (UploadFile): бинарник картинки
         image_type (str): тип картинки ("desktop", "mobile")
-        table_name (str): название таблицы/сущности
     Returns:
         str: path
     """
@@ -242,37 +484,140 @@ async def save_image(image: UploadFile, image_type: str, table_name: str) -> str
         )
     # Проверяем тип изображения
     if image_type not in allowed_types:
-        logger.info(
-            "Тип изображения неверный или отсутствует (ожидается 'desktop', или 'mobile')"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Недопустимый тип изображения. Разрешены только {', '.join(allowed_types)}.",
+        )
+
+    # Отклоняем заведомо слишком большой файл до чтения, если размер известен
+    max_size = settings.files.max_image_size
+    if image.size is not None and image.size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Размер изображения превышает {max_size} байт.",
         )
-        return False
-    # Генерация уникального имени и пути файла
-    file_extension = image.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4()}_{image_type}.{file_extension}"
 
     # Проверяем налиличе директории и создаем ее, если требуется
-    directory_path = f"{settings.files.image_files}/{table_name}"
-    if not os.path.exists(directory_path):
-        os.makedirs(directory_path)
+    directory_path = settings.files.image_files
+    # временный файл и итоговый путь в одной директории base_dir,
+    # чтобы перенос был атомарным и не зависел от рабочей директории
+    await aiofiles.os.makedirs(image_file_path(directory_path), exist_ok=True)
 
-    file_location = f"{directory_path}/{unique_filename}"
-    logger.info(f"Пукть для сохранения картинки: {file_location}")
+    # пишем во временный файл, имя станет известно только после хеширования
+    temp_location = image_file_path(f"{directory_path}/.{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    size = 0
     try:
-        logger.info(f"Попытка чтения файла: {image.filename}")
-        file_content = await image.read()
-        logger.info(f"Файл прочитан, размер: {len(file_content)} байт")
-        with open(file_location, "wb") as buffer:
-            buffer.write(file_content)
+        logger.info("Попытка чтения файла: {}", image.filename)
+        async with aiofiles.open(temp_location, "wb") as buffer:
+            # читаем загрузку частями, не держа ее в памяти целиком
+            while chunk := await image.read(settings.files.upload_chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Размер изображения превышает {max_size} байт.",
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+        logger.info("Файл прочитан, размер: {} байт", size)
+        # одинаковое содержимое всегда получает один и тот же путь
+        content_hash = digest.hexdigest()
+        file_extension = IMAGE_EXTENSIONS[image.content_type]
+        image_path = (
+            f"/{directory_path}/{content_hash[:2]}/{content_hash}.{file_extension}"
+        )
+        file_location = image_file_path(image_path)
+        logger.info("Пукть для сохранения картинки: {}", file_location)
+        if await aiofiles.os.path.exists(file_location):
+            logger.info("Файл {} уже есть на диске, повторно не пишем", file_location)
+            # свежая дата изменения защищает файл от сборщика сирот
+            await asyncio.to_thread(os.utime, file_location)
+        else:
+            await aiofiles.os.makedirs(file_location.parent, exist_ok=True)
+            await aiofiles.os.replace(temp_location, file_location)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Ошибка при чтении файла: {e}")
+        logger.error("Ошибка при чтении файла: {}", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Ошибка при чтении файла."
         )
-    # Генерация URL для изображения
-    image_path = f"/{settings.files.image_files}/{table_name}/{unique_filename}"
+    finally:
+        if await aiofiles.os.path.exists(temp_location):
+            await aiofiles.os.remove(temp_location)
     return image_path
 
 
+def image_file_path(image_url: str) -> Path:
+    """Абсолютный путь к файлу картинки по ее URL"""
+    return Path(settings.files.base_dir, image_url.lstrip("/"))
+
+
+async def lock_image(image_url: str, session: AsyncSession) -> None:
+    """Блокировка файла картинки до конца текущей транзакции.
+
+    Сериализует появление новой ссылки на файл и его удаление.
+    """
+    await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(image_url))))
+
+
+def card_image_urls(
+    image_desktop: str | None, image_mobile: str | None, image_variants: dict | None
+) -> Iterator[str]:
+    """URL исходников и адаптивных вариантов картинок одной карточки"""
+    yield from (url for url in (image_desktop, image_mobile) if url)
+    for variants in (image_variants or {}).values():
+        for items in variants.values():
+            yield from (item["url"] for item in items)
+
+
+async def count_image_references(image_url: str, session: AsyncSession) -> int:
+    """Количество ссылок на картинку во всех таблицах с карточками
+    Args:
+        image_url (str): URL картинки или ее адаптивного варианта
+        session (AsyncSession): текущая сессия
+    Returns:
+        int: количество записей, ссылающихся на картинку
+    """
+    query = union_all(
+        *[
+            select(model.image_desktop, model.image_mobile, model.image_variants).where(
+                or_(
+                    model.image_desktop == image_url,
+                    model.image_mobile == image_url,
+                    # грубый отбор по тексту JSON, точная проверка ниже
+                    cast(model.image_variants, Text).contains(f'"{image_url}"'),
+                )
+            )
+            for model in models_map.values()
+            if hasattr(model, "image_desktop")
+        ]
+    )
+    result = await session.execute(query)
+    return sum(image_url in set(card_image_urls(*row)) for row in result.all())
+
+
+async def release_image(image_url: str | None, session: AsyncSession) -> None:
+    """Удаление картинки с диска, если на нее не осталось ссылок
+    Args:
+        image_url (str | None): URL картинки
+        session (AsyncSession): текущая сессия (изменения уже закоммичены)
+    """
+    if not image_url or not image_url.startswith(f"/{settings.files.image_files}/"):
+        return
+    try:
+        await lock_image(image_url=image_url, session=session)
+        references = await count_image_references(image_url=image_url, session=session)
+        if references == 0 and image_file_path(image_url).exists():
+            await delete_image(image_url)
+        elif references:
+            logger.info("Файл {} используется еще {} раз", image_url, references)
+    finally:
+        # освобождаем блокировку
+        await session.commit()
+
+
 async def delete_image(file_location: str):
     """Удаление картинки на диске
     Args:
@@ -290,7 +635,10 @@ async def delete_image(file_location: str):
         if os.path.exists(file_location):
             # Удаляем файл
             os.remove(file_location)
-            logger.info(f"Файл {file_location} успешно удален.")
+            logger.info("Файл {} успешно удален.", file_location)
+            # вместе с исходником удаляем и его адаптивные варианты
+            for variant in variant_paths(Path(file_location)):
+                variant.unlink(missing_ok=True)
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -328,14 +676,29 @@ async def update_image(
     model = models_map[table_name]
     try:
         if action == "image_delete":
-            # удаляем картинку на диске
-            await delete_image(payload.image_src)
+            if payload.image_type not in settings.files.allowed_image_types:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Недопустимый тип картинки {payload.image_type}.",
+                )
+            # удалять будем то, что реально записано в БД, а не присланный путь
+            query = select(
+                getattr(model, payload.image_type), model.image_variants
+            ).where(model.id == id)
+            image_url, current_variants = (await session.execute(query)).one()
+            variants = merge_variants(
+                current=current_variants, image_type=payload.image_type, variants=None
+            )
             query = (
-                update(model).where(model.id == id).values({payload.image_type: None})
+                update(model)
+                .where(model.id == id)
+                .values({payload.image_type: None, "image_variants": variants})
             )
-            logger.info(f"Удаление в поле {payload.image_type} успешно!")
+            logger.info("Удаление в поле {} успешно!", payload.image_type)
             await session.execute(query)
-            await session.commit()
+            await commit_content(session=session)
+            # удаляем картинку на диске, если она больше нигде не используется
+            await release_image(image_url=image_url, session=session)
             return {"message": "Изображение успешно удалено"}
         if action == "image_refresh":
             return
@@ -352,7 +715,7 @@ async def update_image(
         #     setattr(entity, payload.image_type, payload.image_src)
         #     logger.info(f"Обновление в поле {payload.image_type} успешно!")
     except Exception as e:
-        logger.error(f"Ошибка при обновлении картинки: {e}")
+        logger.error("Ошибка при обновлении картинки: {}", e)
         await session.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return {"message": "Операция по изменению картинки завершена успешно!"}
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterator
+
+from core.config import settings
+from core.db_helper import db_helper
+from crud.sections import card_image_urls, count_image_references, lock_image
+from loguru import logger
+from sections.models import models_map
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def iter_upload_files(directory: str) -> Iterator[os.DirEntry]:
+    """Потоковый обход директории загрузок без построения полного списка"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_upload_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def file_url(path: str) -> str:
+    """URL файла в том виде, в котором он хранится в БД"""
+    return f"/{Path(path).relative_to(settings.files.base_dir).as_posix()}"
+
+
+async def collect_referenced(session: AsyncSession) -> set[str]:
+    """Все URL картинок и их вариантов, на которые ссылаются карточки
+    Args:
+        session (AsyncSession): текущая сессия
+    Returns:
+        set[str]: URL файлов, которые удалять нельзя
+    """
+    query = union_all(
+        *[
+            select(model.image_desktop, model.image_mobile, model.image_variants)
+            for model in models_map.values()
+            if hasattr(model, "image_desktop")
+        ]
+    )
+    referenced = set()
+    result = await session.stream(query)
+    async for row in result:
+        referenced.update(card_image_urls(*row))
+    return referenced
+
+
+def find_orphans(directory: str, referenced: set[str], grace: float) -> list[str]:
+    """Файлы старше периода ожидания, на которые никто не ссылается"""
+    deadline = time.time() - grace
+    return [
+        entry.path
+        for entry in iter_upload_files(directory)
+        if entry.stat(follow_symlinks=False).st_mtime < deadline
+        and file_url(entry.path) not in referenced
+    ]
+
+
+class UploadsCollector:
+    """Сборщик осиротевших файлов в директории загрузок.
+
+    Кандидаты определяются одним сравнением содержимого директории со всеми
+    ссылками из БД, а перед удалением каждый файл перепроверяется под той же
+    блокировкой, что и при загрузке картинки.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        grace: float,
+        interval: float = 0,
+        quarantine: str | None = None,
+    ) -> None:
+        self.directory = directory
+        self.grace = grace
+        self.interval = interval
+        self.quarantine = quarantine
+        self._task: asyncio.Task | None = None
+
+    async def collect(self, dry_run: bool = False) -> list[str]:
+        """Один проход сборщика
+        Args:
+            dry_run (bool): только найти сирот, ничего не трогая
+        Returns:
+            list[str]: URL удаленных (или найденных при dry_run) файлов
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        async with db_helper.session_factory() as session:
+            referenced = await collect_referenced(session=session)
+            await session.commit()
+            candidates = await asyncio.to_thread(
+                find_orphans, self.directory, referenced, self.grace
+            )
+            if dry_run:
+                return [file_url(path) for path in candidates]
+            removed = []
+            for path in candidates:
+                url = file_url(path)
+                try:
+                    await lock_image(image_url=url, session=session)
+                    references = await count_image_references(
+                        image_url=url, session=session
+                    )
+                    # файл могли переиспользовать после снимка ссылок
+                    if references == 0 and await asyncio.to_thread(
+                        self._is_expired, path
+                    ):
+                        await asyncio.to_thread(self._dispose, path)
+                        removed.append(url)
+                finally:
+                    await session.commit()
+        logger.info(f"Сборщик загрузок обработал {len(removed)} файлов-сирот")
+        return removed
+
+    async def start(self) -> None:
+        """Запуск периодической сборки"""
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановка периодической сборки"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _is_expired(self, path: str) -> bool:
+        try:
+            return os.stat(path).st_mtime < time.time() - self.grace
+        except FileNotFoundError:
+            return False
+
+    def _dispose(self, path: str) -> None:
+        if self.quarantine is None:
+            os.remove(path)
+            return
+        target = Path(self.quarantine, Path(path).relative_to(self.directory))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(path, target)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Ошибка сборщика загрузок: {e}")
+
+
+uploads_collector = UploadsCollector(
+    directory=str(Path(settings.files.base_dir, settings.files.image_files)),
+    grace=settings.files.uploads_gc_grace,
+    interval=settings.files.uploads_gc_interval,
+    quarantine=(
+        str(Path(settings.files.base_dir, settings.files.uploads_quarantine))
+        if settings.files.uploads_quarantine
+        else None
+    ),
+)
@@ -1,6 +1,42 @@
+from auth.token_cache import token_cache
 from crud.dao import BaseDAO
+from pydantic import BaseModel
+from sqlalchemy import event
 from users.models import User
 
 
 class UsersDAO(BaseDAO):
     model = User
+
+    def clear_token_cache(self) -> None:
+        """Сброс кэша токенов, когда изменения пользователей закоммичены.
+
+        Раньше коммита сбрасывать нельзя: параллельный запрос успеет
+        закэшировать еще старый снимок пользователя.
+        """
+        event.listen(
+            self._session.sync_session,
+            "after_commit",
+            lambda session: token_cache.clear(),
+            once=True,
+        )
+
+    async def update(self, filters: BaseModel, values: BaseModel):
+        rowcount = await super().update(filters=filters, values=values)
+        # кэш токенов хранит снимки пользователей
+        self.clear_token_cache()
+        return rowcount
+
+    async def delete(self, filters: BaseModel):
+        rowcount = await super().delete(filters=filters)
+        self.clear_token_cache()
+        return rowcount
+
+    async def bulk_update(
+        self, records: list[BaseModel], chunk_size: int | None = None
+    ):
+        updated_count = await super().bulk_update(
+            records=records, chunk_size=chunk_size
+        )
+        self.clear_token_cache()
+        return updated_count
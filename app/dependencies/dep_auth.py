@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 
+from auth.token_cache import token_cache
 from auth.utils import decode_jwt
 from core import db_helper
 from core.exceptions import exc
@@ -29,9 +30,9 @@ def get_refresh_token(request: Request) -> str:
 
 async def check_refresh_token(
     token: str = Depends(get_refresh_token),
-    session: AsyncSession = Depends(db_helper.get_session_without_commit),
+    session: AsyncSession = Depends(db_helper.get_read_session),
 ) -> User:
-    logger.info(f"Проверяем refresh_token и возвращаем пользователя.")
+    logger.info("Проверяем refresh_token и возвращаем пользователя.")
     try:
         payload = decode_jwt(token=token)
         user_id = payload.get("sub")
@@ -46,10 +47,13 @@ async def check_refresh_token(
 
 
 async def get_current_user(
-    token: str = Depends(get_access_token),
-    session: AsyncSession = Depends(db_helper.get_session_without_commit),
+    request: Request, token: str = Depends(get_access_token)
 ) -> User:
     # logger.info(f"Проверяем access_token и возвращаем пользователя.")
+    # Повторные запросы с тем же токеном обходятся без проверки подписи и БД
+    principal = token_cache.get(token)
+    if principal is not None:
+        return principal.user
     try:
         payload = decode_jwt(token=token)  # Декодируем токен
     except ExpiredSignatureError:
@@ -67,8 +71,12 @@ async def get_current_user(
     if not user_id:
         raise exc.user_id_not_found
 
-    user = await UsersDAO(session).find_one_or_none_by_id(data_id=int(user_id))
+    generation = token_cache.generation
+    # сессию открываем только после промаха кэша и проверки токена
+    async with db_helper.read_session(request) as session:
+        user = await UsersDAO(session).find_one_or_none_by_id(data_id=int(user_id))
     if not user:
         raise exc.user_not_found
 
+    token_cache.set(token=token, claims=payload, user=user, generation=generation)
     return user
@@ -1,23 +1,43 @@
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 import uvicorn
 from api import router as router_api
 from api.admin import router as router_admin
+from api.health import router as router_health
 from api.landing import router as router_landing
+from api.metrics import router as router_metrics
+from auth.password_pool import password_pool
 from core import db_helper as db
+from core.assets import asset_manifest
 from core.config import settings
+from core.invalidation import invalidation_bus
+from core.logs import setup_logging, shutdown_logging
+from core.metrics import MetricsMiddleware, instrument_database
+from core.profiler import ProfilerMiddleware, profile_database
+from core.replicas import PrimaryPinMiddleware
+from core.static import CachedStaticFiles
+from crud.images import shutdown_executor
+from crud.uploads_gc import uploads_collector
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from loguru import logger
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    setup_logging()
     logger.info("Инициализация...")
+    await invalidation_bus.start()
+    await uploads_collector.start()
     yield
 
     logger.info("Завершение...")
+    await uploads_collector.stop()
+    await invalidation_bus.stop()
+    shutdown_executor()
+    password_pool.shutdown()
     await db.dispose()
+    await shutdown_logging()
 
 
 main_app = FastAPI(
@@ -30,9 +50,34 @@ main_app.include_router(
     router=router_landing,
 )
 main_app.include_router(router=router_admin)
+main_app.include_router(router=router_health)
+if settings.metrics.enabled:
+    instrument_database(db)
+    main_app.include_router(router=router_metrics)
+    main_app.add_middleware(MetricsMiddleware)
+if settings.profiler.enabled:
+    profile_database(db)
+    main_app.add_middleware(ProfilerMiddleware)
+if db.replicas:
+    main_app.add_middleware(
+        PrimaryPinMiddleware,
+        cookie=settings.db.primary_pin_cookie,
+        max_age=settings.db.primary_pin_seconds,
+    )
 
+# Загруженные картинки и собранная статика лежат под хешем содержимого
+immutable_prefixes = tuple(
+    f"{Path(directory).relative_to(settings.files.static_files).as_posix()}/"
+    for directory in (settings.files.image_files, settings.files.assets_dir)
+)
 main_app.mount(
-    "/static", StaticFiles(directory=settings.files.static_files), name="static"
+    "/static",
+    CachedStaticFiles(
+        directory=settings.files.static_files,
+        immutable_prefixes=immutable_prefixes,
+        manifest=asset_manifest,
+    ),
+    name="static",
 )
 
 
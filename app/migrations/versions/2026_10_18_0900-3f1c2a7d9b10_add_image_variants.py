@@ -0,0 +1,28 @@
+"""add image variants to cards
+
+Revision ID: 3f1c2a7d9b10
+Revises: 8bd458181ba1
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a7d9b10"
+down_revision: Union[str, None] = "8bd458181ba1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table_name in ("achievements", "products", "strategies"):
+        op.add_column(table_name, sa.Column("image_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    for table_name in ("achievements", "products", "strategies"):
+        op.drop_column(table_name, "image_variants")
@@ -0,0 +1,49 @@
+"""gapped card order within sections
+
+Revision ID: 9c4e7b21f5a3
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e7b21f5a3"
+down_revision: Union[str, None] = "3f1c2a7d9b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# совпадает с crud.sections.ORDER_GAP
+ORDER_GAP = 1024
+
+
+def upgrade() -> None:
+    for table_name in ("achievements", "products", "strategies"):
+        op.create_index(
+            f"ix_{table_name}_section_id_order_value",
+            table_name,
+            ["section_id", "order_value"],
+            unique=False,
+        )
+        # раздвигаем существующий порядок внутри каждой секции
+        op.execute(sa.text(f"""
+                UPDATE {table_name} AS t
+                SET order_value = ordered.position * :gap
+                FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY section_id ORDER BY order_value, id
+                    ) AS position
+                    FROM {table_name}
+                ) AS ordered
+                WHERE t.id = ordered.id
+                """).bindparams(gap=ORDER_GAP))
+
+
+def downgrade() -> None:
+    # порядок карточек сохраняется, меняется только шаг значений
+    for table_name in ("achievements", "products", "strategies"):
+        op.drop_index(f"ix_{table_name}_section_id_order_value", table_name=table_name)
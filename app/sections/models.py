@@ -1,8 +1,8 @@
 from typing import List
 
 from core.base import Base
-from sqlalchemy import Column, ForeignKey, Integer, String, Table
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, String, Table
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 
 # Промежуточная таблица для связи многие ко многим
 card_badge_achievement = Table(
@@ -26,14 +26,15 @@ class Section(Base):
     achievements: Mapped[List["Achievement"]] = relationship(
         "Achievement",
         back_populates="sections",
+        order_by="Achievement.order_value",
     )
     # Связь с Product
     products: Mapped[List["Product"]] = relationship(
-        "Product", back_populates="sections"
+        "Product", back_populates="sections", order_by="Product.order_value"
     )
     # Связь со стратегическим видением
     strategies: Mapped[List["Strategy"]] = relationship(
-        "Strategy", back_populates="sections"
+        "Strategy", back_populates="sections", order_by="Strategy.order_value"
     )
 
 
@@ -55,12 +56,25 @@ class Card(Base):
     image_desktop: Mapped[str] = mapped_column(String, nullable=True)
     image_mobile: Mapped[str] = mapped_column(String, nullable=True)
     image_alt: Mapped[str] = mapped_column(String, nullable=True)
+    # Адаптивные варианты картинок: {image_type: {формат: [{width, url}]}}
+    image_variants: Mapped[dict] = mapped_column(JSON, nullable=True)
     button_text: Mapped[str] = mapped_column(String, nullable=True)
     button_url: Mapped[str] = mapped_column(String, nullable=True)
     link_text: Mapped[str] = mapped_column(String, nullable=True)
     link_url: Mapped[str] = mapped_column(String, nullable=True)
     order_value: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
 
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        # порядок карточек и последний order_value читаются в пределах секции
+        return (
+            Index(
+                f"ix_{cls.__tablename__}_section_id_order_value",
+                "section_id",
+                "order_value",
+            ),
+        )
+
 
 class Achievement(Card):
     __tablename__ = "achievements"
@@ -80,3 +80,23 @@ class ImageUpdate(BaseModel):
         description="тип действия над картикой. Ожидается image_delete, или image_refresh"
     )
     image_src: str = Field(description="ресурс картинки для удаления")
+
+
+# Перенос карточки внутри секции
+class CardMove(BaseModel):
+    id: int = Field(description="id перемещаемой карточки")
+    after_id: int | None = Field(
+        default=None,
+        description="id карточки, после которой встает перемещаемая. None - в начало секции",
+    )
+
+
+class CardsReorder(BaseModel):
+    moves: list[CardMove] = Field(
+        min_length=1, description="переносы, применяются по порядку в одной транзакции"
+    )
+
+
+class CardOrder(BaseModel):
+    id: int = Field(description="id карточки")
+    order_value: int = Field(description="порядковое значение карточки")
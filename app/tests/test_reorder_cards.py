@@ -0,0 +1,111 @@
+"""Перенос карточек несколькими шагами в одном запросе.
+
+Нужна Postgres из APP_CONFIG__DB__URL с примененными миграциями. Тест
+создает отдельную секцию со своими карточками и удаляет их после себя.
+Запуск из директории app: python -m pytest tests
+"""
+
+import pytest
+from core.config import settings
+from core.db_helper import DatabaseHelper
+from crud.sections import reorder_cards
+from sections.models import Achievement, Section
+from sections.schemas import CardsReorder
+from sqlalchemy import delete, select
+
+TABLE_NAME = "achievements"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """Отдельный движок на тест, глобальный db_helper приложения не трогаем"""
+    db = DatabaseHelper(url=str(settings.db.url), pool_size=2, max_overflow=0)
+    try:
+        async with db.engine.connect():
+            pass
+    except OSError as e:
+        await db.dispose()
+        pytest.skip(f"Postgres недоступна: {e}")
+    yield db
+    await db.dispose()
+
+
+async def reorder(db: DatabaseHelper, order_values: dict[str, int], moves: list):
+    """Карточки с заданными order_value, переносы по их названиям
+    Returns:
+        tuple: ответ reorder_cards по названиям и названия в итоговом порядке
+    """
+    async with db.session_factory() as session:
+        section = Section(title="test reorder")
+        session.add(section)
+        await session.flush()
+        cards = {
+            title: Achievement(
+                section_id=section.id, title=title, order_value=order_value
+            )
+            for title, order_value in order_values.items()
+        }
+        session.add_all(cards.values())
+        await session.commit()
+    try:
+        titles = {card.id: title for title, card in cards.items()}
+        payload = CardsReorder(
+            moves=[
+                {
+                    "id": cards[title].id,
+                    "after_id": cards[after].id if after else None,
+                }
+                for title, after in moves
+            ]
+        )
+        async with db.session_factory() as session:
+            response = await reorder_cards(TABLE_NAME, payload, session=session)
+        async with db.session_factory() as session:
+            result = await session.execute(
+                select(Achievement.id, Achievement.order_value)
+                .where(Achievement.section_id == section.id)
+                .order_by(Achievement.order_value)
+            )
+            rows = result.all()
+    finally:
+        async with db.session_factory() as session:
+            await session.execute(
+                delete(Achievement).where(Achievement.section_id == section.id)
+            )
+            await session.execute(delete(Section).where(Section.id == section.id))
+            await session.commit()
+    stored = {titles[id]: order_value for id, order_value in rows}
+    assert len(set(stored.values())) == len(stored), "order_value повторяются"
+    returned = {titles[item.id]: item.order_value for item in response}
+    # ответ совпадает с тем, что записано в БД
+    assert returned == {title: stored[title] for title in returned}
+    return returned, [titles[id] for id, _ in rows]
+
+
+@pytest.mark.anyio
+async def test_moves_see_previous_moves(db):
+    # второй перенос должен учитывать, что D уже стоит после A
+    returned, order = await reorder(
+        db,
+        {"A": 1024, "B": 2048, "C": 3072, "D": 4096},
+        [("D", "A"), ("C", "A")],
+    )
+    assert order == ["A", "C", "D", "B"]
+    assert set(returned) == {"C", "D"}
+
+
+@pytest.mark.anyio
+async def test_respace_keeps_previous_moves(db):
+    # между B и C промежутка нет: второй перенос раздвигает секцию
+    returned, order = await reorder(
+        db,
+        {"A": 1024, "B": 2048, "C": 2049, "D": 2050},
+        [("A", "D"), ("D", "B")],
+    )
+    assert order == ["B", "D", "C", "A"]
+    assert set(returned) == {"A", "D"}